@@ -3,6 +3,7 @@
 import json
 import requests
 import textwrap
+import time
 from langchain_ollama import ChatOllama
 
 # ── 1. Open-Meteo weather-code lookup ──────────────────────────────────────
@@ -28,13 +29,17 @@ WEATHER_CODES = {
 # ── 3. LLM client ───────────────────────────────────────────────────────────
 llm = ChatOllama(model="llama3.2", temperature=0.0)
 
+# The °C → °F step always follows get_weather, so by default it runs
+# locally; False asks the LLM to plan it too (one more round trip).
+DETERMINISTIC_STEPS = True
+
 # ── 4. System prompt ────────────────────────────────────────────────────────
 
 # ── 5. TAO run helper ───────────────────────────────────────────────────────
 
     # LLM chooses coordinates
 
-    # LLM decides to convert °C → °F
+    # LLM decides to convert °C → °F (unless the step is deterministic)
 
     # Assemble final answer
 
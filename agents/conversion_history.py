@@ -0,0 +1,91 @@
+# conversion_history.py
+# Conversion history for the currency agent, kept in SQLite instead of a
+# list inside currency_memory.json.
+#
+# Rewriting the whole memory file on every query made each conversion cost
+# O(history) I/O, and two agents sharing the file overwrote each other's
+# entries. Each conversion is now a single INSERT in WAL mode: constant
+# cost, atomic, and safe with several processes appending at once.
+# Indexes on (pair, id) and time serve per-pair and time-range reads,
+# and page() fetches one page at a time by keyset (id < last seen), so
+# showing history never loads all of it.
+#
+# A "history" list left in an old currency_memory.json is imported once.
+
+import sqlite3
+import threading
+import time
+
+# Configuration constants
+HISTORY_DB = "currency_history.sqlite3"
+HISTORY_PAGE_SIZE = 10
+BUSY_TIMEOUT = 10                   # seconds to wait for another writer's lock
+
+class ConversionHistory:
+    """Append-only SQLite log of conversions, indexed by currency pair and time"""
+
+    def __init__(self, path=HISTORY_DB):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL, query TEXT,"
+                " amount REAL, frm TEXT, dst TEXT, result REAL)"
+            )
+            # Pages are ordered by id, so the pair index ends in id: a pair's
+            # page is an index range scan with no sort
+            self.conn.execute("DROP INDEX IF EXISTS history_pair_ts")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_pair_id ON history (frm, dst, id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_ts ON history (ts)")
+
+    def append(self, query, amount, frm, to, result, ts=None):
+        """Record one conversion; returns its id"""
+        return self.append_many([(query, amount, frm, to, result)], ts)[-1]
+
+    def append_many(self, rows, ts=None):
+        """Record (query, amount, from, to, result) rows in one transaction; returns their ids"""
+        ts = time.time() if ts is None else ts
+        ids = []
+        with self.lock, self.conn:
+            for query, amount, frm, to, result in rows:
+                cur = self.conn.execute(
+                    "INSERT INTO history (ts, query, amount, frm, dst, result) VALUES (?, ?, ?, ?, ?, ?)",
+                    (ts, query, float(amount), frm.upper(), to.upper(), float(result)),
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def page(self, before_id=None, limit=HISTORY_PAGE_SIZE, pair=None, since=None):
+        """Up to `limit` entries, newest first, older than `before_id`; optionally one pair or after `since`"""
+        clauses, params = [], []
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if pair is not None:
+            clauses.append("frm = ? AND dst = ?")
+            params += [pair[0].upper(), pair[1].upper()]
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, ts, query, amount, frm, dst, result FROM history {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, pair=None):
+        with self.lock:
+            if pair is None:
+                return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM history WHERE frm = ? AND dst = ?", (pair[0].upper(), pair[1].upper())
+            ).fetchone()[0]
+
+    def import_entries(self, entries):
+        """Import the old in-file history list ({query, amount, from, to, result} dicts)"""
+        self.append_many((e["query"], e["amount"], e["from"], e["to"], e["result"]) for e in entries)
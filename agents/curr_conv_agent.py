@@ -1,13 +1,28 @@
 import os
 import json
 import re
-import requests
 from smolagents import CodeAgent, LiteLLMModel, tool
 
+from conversion_history import ConversionHistory, HISTORY_PAGE_SIZE
+from currency_batch import convert_batch, parse_conversions, read_conversions
+from rates import RateTable
+
+# Fully parsed queries ("Convert 100 USD to EUR", "400 JPY", ...) are
+# converted directly: one rate lookup and a multiplication, no LLM. The
+# CodeAgent only handles questions the parser cannot read. Set
+# DIRECT_MODE = False to send every query through the agent, for comparison.
+DIRECT_MODE = True
+
 # -----------------------------------------------------------------------------
 # MEMORY PERSISTENCE (with history)
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+# RATE CACHE (one USD table answers every pair; saved next to the memory file)
+# -----------------------------------------------------------------------------
+
+rates = RateTable()
+
 # -----------------------------------------------------------------------------
 # SMOLAGENTS TOOLS
 # -----------------------------------------------------------------------------
@@ -30,6 +45,37 @@ model = LiteLLMModel(
 )
 
 
+# -----------------------------------------------------------------------------
+# DIRECT CONVERSION (no LLM)
+# -----------------------------------------------------------------------------
+
+def convert_direct(amt, frm, to):
+    """Convert a fully parsed query with the same rate tool the agent uses, locally."""
+    rate = fetch_live_rate(frm, to)
+    return float(amt) * rate
+
+# -----------------------------------------------------------------------------
+# BATCH CONVERSION (several amounts or a file; always direct, no LLM)
+# -----------------------------------------------------------------------------
+
+BATCH_PRINT_LIMIT = 20
+
+def convert_many(conversions):
+    """Convert [(amount, from, to)] against the cached rates, record them in one transaction and print them."""
+    results = convert_batch(conversions, rates)
+    history.append_many((f"Convert {amt:g} {frm} to {to}", amt, frm, to, result)
+                        for (amt, frm, to), result in zip(conversions, results))
+    for (amt, frm, to), result in list(zip(conversions, results))[:BATCH_PRINT_LIMIT]:
+        print(f"  {amt:g} {frm} is approximately {result:.2f} {to}.")
+    if len(results) > BATCH_PRINT_LIMIT:
+        print(f"  ... {len(results) - BATCH_PRINT_LIMIT} more (see 'history')")
+    print()
+
+    # The last amount becomes the context for the next query
+    amt, frm, to = conversions[-1]
+    memory.update({"last_amount": f"{amt:g}", "last_from": frm, "last_to": to})
+    save_memory(memory)
+
 # -----------------------------------------------------------------------------
 # QUERY PARSING + FILLING from MEMORY
 # -----------------------------------------------------------------------------
@@ -69,7 +115,9 @@ def parse_and_fill(query: str):
 if __name__ == "__main__":
     banner = (
         "Currency Converter Agent with Memory & History\n"
-        "(type 'exit' to quit, 'history' to show past conversions)\n"
+        "(type 'exit' to quit, 'history' to show past conversions,\n"
+        " 'history USD EUR' for one pair, 'batch amounts.csv' to convert a file;\n"
+        " several amounts at once: '100 USD, 250 GBP, 900 JPY to EUR')\n"
     )
     print(banner)
 
@@ -80,14 +128,48 @@ if __name__ == "__main__":
         # Handle special commands - exit and history
 
 
+        if low.startswith("batch "):
+            try:
+                convert_many(read_conversions(user_input[6:].strip(), memory["last_from"], memory["last_to"]))
+            except (OSError, ValueError, RuntimeError) as e:
+                print(f"Error: {e}\n")
+            continue
+
         # Normal convert request
         
         try:
-            amt, frm, to = parse_and_fill(user_input)
-            prompt = f"Convert {amt} {frm} to {to}"
-
-            # Run the agent (LLM will call fetch_live_rate & calculate)
-         
+            # Several amounts on one line ("100 USD, 250 GBP to EUR") go as one batch
+            try:
+                conversions = parse_conversions(user_input, memory["last_from"], memory["last_to"])
+            except ValueError:
+                conversions = []
+            if len(conversions) > 1:
+                convert_many(conversions)
+                continue
+
+            try:
+                amt, frm, to = parse_and_fill(user_input)
+            except ValueError as parse_error:
+                # Forms only the grammar reads, e.g. "1,000 USD to EUR"
+                if conversions:
+                    convert_many(conversions)
+                    continue
+                # Free-form question: only the LLM can make sense of it
+                try:
+                   
+                except Exception:
+                    raise parse_error
+                print(f"{answer}\n")
+                continue
+
+            if DIRECT_MODE:
+                # Everything is known: fetch the rate and multiply, no LLM
+                result = convert_direct(amt, frm, to)
+            else:
+                prompt = f"Convert {amt} {frm} to {to}"
+
+                # Run the agent (LLM will call fetch_live_rate & calculate)
+             
 
             # Store and persist this interaction
 
@@ -0,0 +1,116 @@
+# currency_batch.py
+# Multi-amount and file-driven conversions for the currency agent.
+#
+# One compiled tokenizer regex scans a query left to right in a single
+# pass, and a small grammar over its tokens reads any number of amounts:
+#
+#     [convert] item (sep item)* [to CODE] ...      item := NUMBER [CODE]
+#
+# so "100 USD, 250 GBP and 900 JPY to EUR" is three conversions, and the
+# old one-amount shapes ("400 JPY", "Convert 400 to GBP", "200") still
+# parse. Amounts may group thousands: "1,000 USD" is one amount, and a
+# comma between two digits is never read as a separator ("1,0000" is an
+# error, not the amounts 1 and 0).
+# A missing source carries over from the previous amount, then from
+# memory; a missing target comes from the next "to CODE", then from memory.
+# Files are read the same way: CSV rows (amount, from[, to]) or one query
+# per line. convert_batch() then looks up each distinct pair once in the
+# cached rate table and multiplies, so a batch costs one pass over the
+# amounts rather than one conversion round trip each.
+
+import csv
+import re
+
+AMOUNT = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?(?![\d.]|,\d)|\d+(?:\.\d+)?"
+AMOUNT_RE = re.compile(AMOUNT)
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<num>""" + AMOUNT + r""")
+      | (?P<convert>(?<![A-Za-z])convert(?![A-Za-z]))
+      | (?P<to>(?<![A-Za-z])(?:into|to|in)(?![A-Za-z]))
+      | (?P<sep>(?<!\d),|,(?!\d)|;|(?<![A-Za-z])and(?![A-Za-z]))
+      | (?P<code>(?<![A-Za-z])[A-Za-z]{3}(?![A-Za-z]))
+    )\s*""", re.IGNORECASE | re.VERBOSE)
+
+def tokenize(text: str):
+    """[(kind, value)] for a query; ValueError at the first character no token matches"""
+    tokens, pos = [], 0
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Unexpected text at {text[pos:pos + 10]!r}")
+        tokens.append((m.lastgroup, m.group(m.lastgroup)))
+        pos = m.end()
+    return tokens
+
+def parse_conversions(text: str, last_from=None, last_to=None):
+    """[(amount, from, to)] for every amount in `text`, gaps filled as described above"""
+    tokens = tokenize(text)
+    i = 1 if tokens and tokens[0][0] == "convert" else 0
+    items, pending = [], []         # pending: items still waiting for a "to CODE"
+    frm = last_from
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind != "num":
+            raise ValueError(f"Expected an amount, got {value!r}")
+        item = [float(value.replace(",", "")), None, None]
+        i += 1
+        if i < len(tokens) and tokens[i][0] == "code":
+            frm = tokens[i][1].upper()
+            i += 1
+        item[1] = frm
+        items.append(item)
+        pending.append(item)
+        if i < len(tokens) and tokens[i][0] == "to":
+            if i + 1 >= len(tokens) or tokens[i + 1][0] != "code":
+                raise ValueError("Expected a currency code after 'to'")
+            for waiting in pending:
+                waiting[2] = tokens[i + 1][1].upper()
+            pending = []
+            i += 2
+        if i < len(tokens):
+            if tokens[i][0] != "sep":
+                raise ValueError(f"Expected ',' or 'and', got {tokens[i][1]!r}")
+            i += 1
+    for item in pending:
+        item[2] = last_to
+    if not items or any(frm is None or to is None for _, frm, to in items):
+        raise ValueError("Every amount needs a source and a target currency")
+    return [tuple(item) for item in items]
+
+def read_conversions(path: str, last_from=None, last_to=None):
+    """All conversions in a file, in one pass: CSV rows (amount, from[, to]) or one query per line"""
+    conversions = []
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            for line_no, row in enumerate(csv.reader(f), 1):
+                cells = [cell.strip() for cell in row if cell.strip()]
+                if not cells:
+                    continue
+                if line_no == 1 and not AMOUNT_RE.fullmatch(cells[0]):
+                    continue        # header row; any later row must parse
+                query = " ".join(cells[:2]) + (f" to {cells[2]}" if len(cells) > 2 else "")
+                try:
+                    conversions += parse_conversions(query, last_from, last_to)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: {e}") from None
+        else:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        conversions += parse_conversions(line.strip(), last_from, last_to)
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{line_no}: {e}") from None
+    return conversions
+
+def convert_batch(conversions, rates):
+    """Converted amounts for [(amount, from, to)]; one rate lookup per distinct pair"""
+    pair_rates = {}
+    results = []
+    for amount, frm, to in conversions:
+        rate = pair_rates.get((frm, to))
+        if rate is None:
+            rate = pair_rates[(frm, to)] = rates.rate(frm, to)
+        results.append(amount * rate)
+    return results
@@ -0,0 +1,70 @@
+# embeddings.py
+# Shared sentence-embedding service for the RAG agents.
+#
+# One SentenceTransformer per model name per process, loaded on first use
+# rather than at import. The provider plugs straight into ChromaDB as the
+# collection's embedding function, so indexing and querying always go
+# through the same model, and repeated questions are answered from an LRU
+# cache instead of the encoder.
+
+import threading
+from functools import lru_cache
+
+import numpy as np
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+# Configuration constants
+EMBED_MODEL = "all-MiniLM-L6-v2"
+ENCODE_BATCH_SIZE = 64
+QUERY_CACHE_SIZE = 1024
+
+class EmbeddingProvider(SentenceTransformerEmbeddingFunction):
+    """Lazily-loaded, batched SentenceTransformer embedding function"""
+
+    _load_lock = threading.Lock()
+
+    def __init__(self, model_name=EMBED_MODEL, device="cpu", normalize_embeddings=False,
+                 batch_size=ENCODE_BATCH_SIZE, cache_size=QUERY_CACHE_SIZE):
+        # Deliberately skip the parent __init__: it loads the model eagerly
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = {}
+        self.batch_size = batch_size
+        self.embed_query = lru_cache(maxsize=cache_size)(self._encode_query)
+
+    @property
+    def model(self):
+        """The SentenceTransformer, loaded once and shared by every provider"""
+        if self.model_name not in self.models:
+            with self._load_lock:
+                if self.model_name not in self.models:
+                    from sentence_transformers import SentenceTransformer
+                    self.models[self.model_name] = SentenceTransformer(self.model_name, device=self.device)
+        return self.models[self.model_name]
+
+    def warm_up(self):
+        """Load the model on a background thread so the first query doesn't pay for it"""
+        threading.Thread(target=lambda: self.model, daemon=True).start()
+
+    def embed_documents(self, texts):
+        """Encode many texts in fixed-size batches"""
+        embeddings = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings,
+        )
+        return [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
+
+    def _encode_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def __call__(self, input):
+        """ChromaDB embedding-function hook"""
+        return self.embed_documents(input)
+
+@lru_cache(maxsize=None)
+def get_embedding_provider(model_name=EMBED_MODEL):
+    """The process-wide provider for `model_name`"""
+    return EmbeddingProvider(model_name)
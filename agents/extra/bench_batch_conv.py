@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+bench_batch_conv.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Measure currency conversions per second for a large list of amounts,
+converted one query at a time (`parse_and_fill` + `convert_direct` +
+`history.append`, as the prompt does for a single query) and as one batch
+(`read_conversions` over a CSV file + `convert_batch` + `history.append_many`).
+
+Rates come from the local fake currency API, so both paths fetch the USD
+table once and then run from the cache; the difference is the per-query
+parsing, memory writes and history transactions the batch path skips.
+
+Run it from the *agents* directory once `curr_conv_agent.py` is merged:
+
+    python extra/bench_batch_conv.py --amounts 20000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from fake_currency_api import start_fake_currency_api  # noqa: E402
+from rates import RateTable                            # noqa: E402
+
+CODES = ["USD", "EUR", "GBP", "JPY", "INR", "CAD", "CHF", "AUD"]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Workload                                                    ║
+# ╚════════════════════════════════════════════════════════════════╝
+def make_rows(n, seed=0):
+    """n random (amount, from, to) rows with distinct currencies"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        frm, to = rng.sample(CODES, 2)
+        rows.append((round(rng.uniform(1, 10_000), 2), frm, to))
+    return rows
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--amounts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    server, url = start_fake_currency_api(delay=0)
+    os.chdir(tempfile.mkdtemp())            # keep the real memory and history files untouched
+    import curr_conv_agent as cc
+    from conversion_history import ConversionHistory
+    from currency_batch import convert_batch, read_conversions
+
+    rows = make_rows(args.amounts)
+    with open("amounts.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["amount", "from", "to"])
+        writer.writerows(rows)
+
+    print(f"{args.amounts} conversions, {len(CODES)} currencies\n")
+    print(f"{'path':<10} {'seconds':>9} {'conv/s':>12} {'API calls':>10} {'history rows':>13}")
+
+    # One query at a time, the way the prompt handles a single line
+    server.requests = 0
+    cc.rates = RateTable(cache_file=None, urls=[url])
+    cc.history = ConversionHistory("per_query.sqlite3")
+    start = time.perf_counter()
+    for amount, frm, to in rows:
+        query = f"Convert {amount} {frm} to {to}"
+        amt, frm, to = cc.parse_and_fill(query)
+        cc.history.append(query, amt, frm, to, cc.convert_direct(amt, frm, to))
+    elapsed = time.perf_counter() - start
+    print(f"{'per query':<10} {elapsed:>9.3f} {len(rows) / elapsed:>12,.0f} {server.requests:>10} "
+          f"{cc.history.count():>13}")
+
+    # The whole file as one batch
+    server.requests = 0
+    rates = RateTable(cache_file=None, urls=[url])
+    history = ConversionHistory("batch.sqlite3")
+    start = time.perf_counter()
+    conversions = read_conversions("amounts.csv")
+    results = convert_batch(conversions, rates)
+    history.append_many((f"Convert {amt:g} {frm} to {to}", amt, frm, to, result)
+                        for (amt, frm, to), result in zip(conversions, results))
+    elapsed = time.perf_counter() - start
+    print(f"{'batch':<10} {elapsed:>9.3f} {len(rows) / elapsed:>12,.0f} {server.requests:>10} "
+          f"{history.count():>13}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+bench_curr_conv.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Time the currency agent's two ways of answering a fully parsed query:
+the direct path (`convert_direct`: one rate lookup and a multiplication)
+and the CodeAgent path (the LLM writes code that calls `fetch_live_rate`
+and `calculate`), with no Ollama and no network.
+
+The model is a stub that waits `--llm-delay` seconds per step and then
+writes the code a well-behaved model would; rates come from the local
+fake currency API. Per-query latency is what a user would see at the
+prompt. Each path starts from an empty rate cache, so it pays for one
+USD table fetch and derives every other pair from it.
+
+Run it from the *agents* directory once `curr_conv_agent.py` is merged:
+
+    python extra/bench_curr_conv.py --queries 10 --llm-delay 2
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+from smolagents.models import ChatMessage, Model
+from smolagents.monitoring import LogLevel
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from fake_currency_api import start_fake_currency_api  # noqa: E402
+from rates import RateTable                            # noqa: E402
+
+QUERIES = ["Convert 100 USD to EUR", "400 JPY", "Convert 250 to GBP", "75",
+           "Convert 1200 INR to CAD", "Convert 9.5 CHF to AUD"]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Stub model                                                  ║
+# ╚════════════════════════════════════════════════════════════════╝
+class StubCodeModel(Model):
+    """Waits `delay` seconds per step, then answers the task with rate + calculate code"""
+
+    def __init__(self, delay):
+        super().__init__(model_id="stub")
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        task = next(m.content for m in messages if m.role == "user")
+        task = task if isinstance(task, str) else " ".join(part.get("text", "") for part in task)
+        amt, frm, to = re.search(r"Convert ([\d.]+) ([A-Z]{3}) to ([A-Z]{3})", task).groups()
+        code = (f"rate = fetch_live_rate(from_currency=\"{frm}\", to_currency=\"{to}\")\n"
+                f"result = calculate(expression=f\"{amt} * {{rate}}\")\n"
+                f"final_answer(result)")
+        return ChatMessage(role="assistant",
+                           content=f"Thought: Fetch the rate, then multiply.\n<code>\n{code}\n</code>")
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="stub model seconds per step")
+    parser.add_argument("--api-delay", type=float, default=0.05, help="fake currency API latency")
+    args = parser.parse_args()
+
+    server, url = start_fake_currency_api(delay=args.api_delay)
+    os.chdir(tempfile.mkdtemp())            # keep the real currency_memory.json untouched
+    import curr_conv_agent as cc
+
+    model = StubCodeModel(args.llm_delay)
+    cc.agent.model = model
+    cc.agent.logger.level = LogLevel.ERROR  # the step-by-step transcript is noise here
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+
+    print(f"{args.queries} queries, stub model {args.llm_delay}s per step, API {args.api_delay}s\n")
+    print(f"{'path':<7} {'mean s':>8} {'p50 s':>8} {'max s':>8} {'LLM calls':>10} {'API calls':>10}")
+    for path in ("direct", "agent"):
+        latencies = []
+        model.calls = server.requests = 0
+        cc.rates = RateTable(cache_file=None, urls=[url])
+        for query in queries:
+            start = time.perf_counter()
+            amt, frm, to = cc.parse_and_fill(query)
+            if path == "direct":
+                result = cc.convert_direct(amt, frm, to)
+            else:
+                result = float(cc.agent.run(f"Convert {amt} {frm} to {to}"))
+            latencies.append(time.perf_counter() - start)
+            assert result > 0
+        print(f"{path:<7} {statistics.mean(latencies):>8.3f} {statistics.median(latencies):>8.3f} "
+              f"{max(latencies):>8.3f} {model.calls:>10} {server.requests:>10}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
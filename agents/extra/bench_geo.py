@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+bench_geo.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Time the distance helpers in `geo.py` on random points: the scalar
+`haversine_distance` in a Python loop (what the agents do today) against
+the NumPy one-to-many and many-to-many versions, then the OfficeIndex ball
+tree against a brute-force scan for nearest and within-radius queries.
+
+No network access is needed; points are generated locally.
+
+Run it from the *agents* directory:
+
+    python extra/bench_geo.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from geo import OfficeIndex, haversine_distance, haversine_many, haversine_matrix  # noqa: E402
+
+SIZES = (10, 1_000, 100_000)
+MATRIX_LIMIT = 1_000     # n x n matrices beyond this are too big to be interesting
+QUERIES = 1_000          # spatial-index lookups timed per size
+RADIUS_MILES = 50
+
+def best_of(fn, repeats=5):
+    """Fastest wall time of `repeats` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def random_points(n, rng):
+    return rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+
+def main():
+    rng = np.random.default_rng(42)
+    home_lat, home_lon = 35.7796, -78.6382
+
+    print(f"{'points':>8} {'kind':<13} {'scalar ms':>10} {'numpy ms':>9} {'speed-up':>9}")
+    for n in SIZES:
+        lats, lons = random_points(n, rng)
+        lat_list, lon_list = lats.tolist(), lons.tolist()
+
+        # One-to-many: home -> every point
+        scalar = best_of(lambda: [haversine_distance(home_lat, home_lon, a, b) for a, b in zip(lat_list, lon_list)])
+        vector = best_of(lambda: haversine_many(home_lat, home_lon, lats, lons))
+        print(f"{n:>8} {'one-to-many':<13} {scalar:>10.3f} {vector:>9.3f} {scalar / vector:>8.1f}x")
+
+        # Many-to-many: every point -> every point
+        if n <= MATRIX_LIMIT:
+            scalar = best_of(lambda: [[haversine_distance(a, b, c, d) for c, d in zip(lat_list, lon_list)]
+                                      for a, b in zip(lat_list, lon_list)], repeats=1)
+            vector = best_of(lambda: haversine_matrix(lats, lons, lats, lons))
+            print(f"{n:>8} {'many-to-many':<13} {scalar:>10.3f} {vector:>9.3f} {scalar / vector:>8.1f}x")
+
+    # Sanity check: both implementations agree
+    lats, lons = random_points(100, rng)
+    expected = [haversine_distance(home_lat, home_lon, a, b) for a, b in zip(lats, lons)]
+    assert np.allclose(haversine_many(home_lat, home_lon, lats, lons), expected)
+
+    bench_spatial_index(rng)
+
+def bench_spatial_index(rng):
+    """Per-query latency of OfficeIndex.nearest/within against a NumPy full scan"""
+    print(f"\n{'points':>8} {'query':<13} {'scan us':>10} {'tree us':>9} {'build ms':>9}")
+    for n in SIZES:
+        lats, lons = random_points(n, rng)
+        start = time.perf_counter()
+        index = OfficeIndex({"name": str(i), "lat": a, "lon": b} for i, (a, b) in enumerate(zip(lats, lons)))
+        build = (time.perf_counter() - start) * 1000
+        q_lats, q_lons = random_points(QUERIES, rng)
+        queries = list(zip(q_lats.tolist(), q_lons.tolist()))
+
+        def scan_nearest():
+            for lat, lon in queries:
+                haversine_many(lat, lon, lats, lons).argmin()
+
+        def scan_within():
+            for lat, lon in queries:
+                np.flatnonzero(haversine_many(lat, lon, lats, lons) <= RADIUS_MILES)
+
+        for kind, scan, tree in (
+            ("nearest", scan_nearest, lambda: [index.nearest(lat, lon) for lat, lon in queries]),
+            (f"within {RADIUS_MILES}mi", scan_within, lambda: [index.within(lat, lon, RADIUS_MILES) for lat, lon in queries]),
+        ):
+            scan_us = best_of(scan, repeats=1) * 1000 / QUERIES
+            tree_us = best_of(tree, repeats=3) * 1000 / QUERIES
+            print(f"{n:>8} {kind:<13} {scan_us:>10.1f} {tree_us:>9.1f} {build:>9.1f}")
+
+    # Sanity check: the tree finds the same nearest point as the scan
+    lat, lon = queries[0]
+    (office, miles), = index.nearest(lat, lon)
+    expected = haversine_many(lat, lon, lats, lons)
+    assert int(office["name"]) == expected.argmin() and np.isclose(miles, expected.min())
+
+if __name__ == "__main__":
+    main()
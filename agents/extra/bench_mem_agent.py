@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+bench_mem_agent.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Show how the travel memory agent's prompt grows over a long session with
+the old unbounded `memory_buffer` (every turn pasted into the prompt)
+and with `ShortTermMemory` (recent turns plus a rolling summary within a
+token budget), with no Ollama.
+
+The session is synthetic: travel questions and answers of realistic
+length. At each checkpoint the table shows the conversation part of the
+prompt in (estimated) tokens and the time to build it; with the budgeted
+memory both stay flat once the budget is reached.
+
+Run it from the *agents* directory:
+
+    python extra/bench_mem_agent.py --turns 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from short_memory import MEMORY_TOKEN_BUDGET, ShortTermMemory, count_tokens  # noqa: E402
+
+CITIES = ["Boston, MA", "Austin, TX", "Denver, CO", "Seattle, WA", "Chicago, IL", "Atlanta, GA"]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Synthetic session                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def make_turn(rng):
+    """One (question, answer) pair of the length the agent usually sees"""
+    city = rng.choice(CITIES)
+    question = f"Which offices are within {rng.randint(50, 400)} miles of {city}, and how far is the nearest one?"
+    offices = rng.sample(CITIES, 3)
+    answer = "The closest offices are " + ", ".join(
+        f"{name} at {rng.uniform(5, 900):.1f} miles" for name in offices
+    ) + f". The nearest one is {offices[0]}, which is a short trip from {city}."
+    return question, answer
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--budget", type=int, default=MEMORY_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    memory_buffer = []
+    short_memory = ShortTermMemory(budget=args.budget)
+    checkpoints = {t for t in (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500) if t <= args.turns} | {args.turns}
+
+    print(f"{args.turns} turns, memory budget {args.budget} tokens\n")
+    print(f"{'turn':>6} {'unbounded tok':>14} {'build ms':>9} {'budgeted tok':>13} {'build ms':>9} "
+          f"{'recent':>7} {'summarized':>11}")
+    for turn in range(1, args.turns + 1):
+        question, answer = make_turn(rng)
+        memory_buffer.append({"user": question, "assistant": answer})
+        short_memory.add(question, answer)
+        if turn not in checkpoints:
+            continue
+
+        start = time.perf_counter()
+        unbounded = "\n".join(f"User: {m['user']}\nAssistant: {m['assistant']}" for m in memory_buffer)
+        unbounded_tokens = count_tokens(unbounded)
+        unbounded_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        budgeted_tokens = count_tokens(short_memory.render())
+        budgeted_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{turn:>6} {unbounded_tokens:>14,} {unbounded_ms:>9.2f} {budgeted_tokens:>13,} {budgeted_ms:>9.2f} "
+              f"{len(short_memory.turns):>7} {short_memory.summarized:>11}")
+
+if __name__ == "__main__":
+    main()
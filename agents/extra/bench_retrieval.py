@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+bench_retrieval.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Compare the office RAG retrievers (dense vectors, BM25, and the hybrid
+reciprocal-rank fusion of both) on recall and latency.
+
+The query set is generated from the data itself:
+* `data/offices.csv` → short keyword questions ("Austin office headcount")
+* `data/offices.pdf` → questions by office nickname ("Tell me about the
+  Southern Office") that never name the city.
+
+A query counts as a hit when one of the top `n` chunks is tagged with the
+expected city.
+
+Run it from the *agents* directory:
+
+    python extra/bench_retrieval.py --n-results 2
+"""
+
+import argparse
+import csv
+import os
+import re
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, "..", "..", "data")
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from embeddings import get_embedding_provider                      # noqa: E402
+from rag_index import OFFICE_CITIES, build_index, iter_pdf_pages  # noqa: E402
+from rag_search import CityMatcher, HybridRetriever                # noqa: E402
+
+PDF_PATH = os.path.join(DATA_DIR, "offices.pdf")
+CSV_PATH = os.path.join(DATA_DIR, "offices.csv")
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Query set                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def build_queries():
+    """Return [(query, expected_city)] derived from the CSV and the PDF"""
+    queries = []
+    with open(CSV_PATH, newline="") as f:
+        for row in csv.DictReader(f):
+            city = row["city"]
+            queries += [
+                (f"{city} office headcount", city),
+                (f"{city} office revenue", city),
+                (f"when did the {city} office open", city),
+            ]
+
+    matcher = CityMatcher(OFFICE_CITIES)
+    for _, text in iter_pdf_pages(PDF_PATH):
+        for line in text.split("\n"):
+            city = matcher.find(line)
+            name = re.match(r"(.+?)\s+\d", line)   # office name precedes the street number
+            if city and name:
+                queries += [
+                    (f"Tell me about the {name.group(1)}", city),
+                    (f"What services does the {name.group(1)} offer?", city),
+                ]
+    return queries
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def run_mode(retriever, city_of, queries, n_results, mode):
+    """Return (recall, latencies_ms) for one retrieval mode"""
+    hits, latencies = 0, []
+    for query, expected in queries:
+        start = time.perf_counter()
+        snippets = retriever.search(query, n_results=n_results, mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(city_of.get(snippet) == expected for snippet in snippets)
+    return hits / len(queries), latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n-results", type=int, default=2)
+    args = parser.parse_args()
+
+    embedder = get_embedding_provider()
+    collection = build_index("office_bench", [PDF_PATH, CSV_PATH], persist=False)
+    records = collection.get(include=["documents", "metadatas"])
+    city_of = {doc: (meta or {}).get("city") for doc, meta in zip(records["documents"], records["metadatas"])}
+    retriever = HybridRetriever(collection, embedder)
+    queries = build_queries()
+
+    # Pay model loading up front so it isn't billed to the first query
+    embedder.embed_query("warm up")
+
+    print(f"{len(queries)} queries, {collection.count()} chunks, recall@{args.n_results}\n")
+    print(f"{'mode':<8} {'recall':>7} {'mean ms':>9} {'p95 ms':>8}")
+    for mode in HybridRetriever.MODES:
+        embedder.embed_query.cache_clear()   # measure the encoder, not the cache
+        recall, latencies = run_mode(retriever, city_of, queries, args.n_results, mode)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{mode:<8} {recall:>7.1%} {statistics.mean(latencies):>9.2f} {p95:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+bench_weather.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Fire many concurrent `get_weather` lookups at a fake Open-Meteo and
+count how many actually reach it, with and without the cache and
+single-flight coalescing in `weather.py`.
+
+"naive" opens a fresh client per call and never caches, like the old
+`requests.get` per tool call; "coalesced" is the shared WeatherClient the
+MCP server uses; "batch" hands every point to `current_weather_many` at
+once, as the server's get_weather_many tool does.
+
+Run it from the *agents* directory:
+
+    python extra/bench_weather.py --clients 200 --cities 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from fake_open_meteo import start_fake_open_meteo  # noqa: E402
+from weather import WeatherClient                  # noqa: E402
+
+CITIES = [(40.71, -74.01), (41.88, -87.63), (37.77, -122.42), (30.27, -97.74), (42.36, -71.06),
+          (47.61, -122.33), (33.75, -84.39), (39.74, -104.99), (25.76, -80.19), (34.05, -118.24)]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Strategies                                                  ║
+# ╚════════════════════════════════════════════════════════════════╝
+async def naive_lookup(url, lat, lon):
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(url, params={"latitude": lat, "longitude": lon, "current_weather": "true"})
+        resp.raise_for_status()
+        return resp.json()["current_weather"]
+
+async def run(strategy, url, points):
+    """Return (elapsed seconds) for one burst of concurrent lookups"""
+    if strategy == "naive":
+        calls = [naive_lookup(url, lat, lon) for lat, lon in points]
+    elif strategy == "batch":
+        client = WeatherClient(base_url=url)
+        calls = [client.current_weather_many(points)]
+    else:
+        client = WeatherClient(base_url=url)
+        calls = [client.current_weather(lat, lon) for lat, lon in points]
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+    if strategy != "naive":
+        await client.aclose()
+    return elapsed
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=200, help="concurrent lookups per burst")
+    parser.add_argument("--cities", type=int, default=5, help="distinct locations asked about")
+    parser.add_argument("--delay", type=float, default=0.2, help="fake upstream latency in seconds")
+    args = parser.parse_args()
+
+    server, url = start_fake_open_meteo(delay=args.delay)
+    # Same city, slightly different coordinates: all round to the same cache key
+    points = [(lat + 0.001 * (i % 3), lon) for i, (lat, lon) in
+              ((i, CITIES[i % args.cities]) for i in range(args.clients))]
+
+    print(f"{args.clients} concurrent lookups over {args.cities} cities, upstream delay {args.delay}s\n")
+    print(f"{'strategy':<10} {'upstream':>9} {'wall s':>8}")
+    for strategy in ("naive", "coalesced", "batch"):
+        server.requests = 0
+        elapsed = asyncio.run(run(strategy, url, points))
+        print(f"{strategy:<10} {server.requests:>9} {elapsed:>8.2f}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+chaos_mcp_agent.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Call `get_weather` many times through one `mcp_agent` AgentRuntime
+against an in-process MCP server that injects faults, and compare how
+many calls succeed and how long the slowest take under different retry
+policies (see `retry_policy.py`).
+
+The fault-injecting server fails a share of calls with a ToolError, as an
+upstream timeout would, and makes another share very slow (a heavy tail).
+Three policies are compared:
+* **none**        – one attempt, no hedging: the old behaviour
+* **retry**       – up to three attempts with jittered exponential backoff
+* **retry+hedge** – the same, plus a second attempt once a call outlives
+  the tool's observed p95 latency
+
+Run it from the *agents* directory once lab 2's `mcp_agent.py` is merged:
+
+    python extra/chaos_mcp_agent.py --calls 300 --fail-rate 0.1 --slow-rate 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import mcp_agent                                   # noqa: E402
+from observability import quantile                 # noqa: E402
+from retry_policy import RetryPolicy               # noqa: E402
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Fault-injecting server                                      ║
+# ╚════════════════════════════════════════════════════════════════╝
+def make_faulty_server(fail_rate, slow_rate, latency, slow_latency):
+    """In-process MCP server whose get_weather fails or stalls at random"""
+    faulty = FastMCP("FaultyWeather")
+    faulty.served = 0
+    logging.getLogger("FastMCP").setLevel(logging.CRITICAL)   # injected faults are expected
+
+    @faulty.tool
+    async def get_weather(lat: float, lon: float) -> dict:
+        faulty.served += 1
+        roll = random.random()
+        if roll < fail_rate:
+            await asyncio.sleep(latency)
+            raise ToolError("upstream timed out (injected)")
+        await asyncio.sleep(slow_latency if roll < fail_rate + slow_rate else latency)
+        return {"temperature": 21.5, "code": 1, "conditions": "Mainly clear"}
+
+    return faulty
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Benchmark                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+POLICIES = {
+    "none":        lambda: RetryPolicy(attempts=1, hedge_tools=()),
+    "retry":       lambda: RetryPolicy(hedge_tools=()),
+    "retry+hedge": lambda: RetryPolicy(),
+}
+
+async def drive(server, policy, calls, concurrency):
+    """Return (successes, per-call seconds) for `calls` get_weather calls"""
+    runtime = mcp_agent.AgentRuntime(url=server)
+    runtime.retry = policy
+    await runtime.connect()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await runtime.call_tool("get_weather", {"lat": 40.0 + i % 10, "lon": -74.0})
+                return True
+            except ToolError:
+                return False
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+    try:
+        results = await asyncio.gather(*(one(i) for i in range(calls)))
+        return sum(results), latencies
+    finally:
+        await runtime.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of calls that raise ToolError")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of calls that stall")
+    parser.add_argument("--latency", type=float, default=0.02, help="normal tool latency in seconds")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="stalled tool latency in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.calls} calls, {args.fail_rate:.0%} failing, {args.slow_rate:.0%} stalling "
+          f"for {args.slow_latency}s\n")
+    print(f"{'policy':<12} {'ok %':>6} {'served':>7} {'retries':>8} {'hedges':>7} {'wins':>5} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for name, make_policy in POLICIES.items():
+        random.seed(args.seed)
+        server = make_faulty_server(args.fail_rate, args.slow_rate, args.latency, args.slow_latency)
+        policy = make_policy()
+        ok, latencies = asyncio.run(drive(server, policy, args.calls, args.concurrency))
+        counts = policy.metrics.counts["get_weather"]
+        print(f"{name:<12} {100 * ok / args.calls:>6.1f} {server.served:>7} {counts['retries']:>8} "
+              f"{counts['hedges']:>7} {counts['hedge_wins']:>5} "
+              + " ".join(f"{quantile(latencies, q) * 1000:>7.0f}" for q in (0.5, 0.95, 0.99)))
+
+if __name__ == "__main__":
+    main()
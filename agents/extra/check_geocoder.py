@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+check_geocoder.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Check the geocoder's caching against the local fake Nominatim, with no
+network access: a cache hit makes no request, an unknown place is cached
+as a miss, an expired entry is fetched again, a new process is served
+from the SQLite file, and requests are spaced by the throttle. Exits
+non-zero on the first failed check.
+
+Run it from the *agents* directory:
+
+    python extra/check_geocoder.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from fake_nominatim import start_fake_nominatim  # noqa: E402
+
+server, url = start_fake_nominatim()
+os.environ["NOMINATIM_URL"] = url                # read by geo at import
+
+from geo import GeocodeCache, Geocoder  # noqa: E402
+
+TTL = 0.5                                        # seconds; short enough to wait out
+INTERVAL = 0.2                                   # throttle under test (Nominatim's is 1 s)
+
+def check(label, condition):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        sys.exit(1)
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Checks                                                      ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main():
+    db = os.path.join(tempfile.mkdtemp(), "geocode_cache.sqlite3")
+    geocoder = Geocoder(GeocodeCache(db, ttl=TTL, miss_ttl=TTL), min_interval=INTERVAL)
+
+    lat, lon = geocoder.geocode("Boston, MA")
+    check("first lookup goes to the server", server.requests == 1 and lat is not None)
+    check("repeat lookup is a cache hit with no request",
+          geocoder.geocode("boston ma") == (lat, lon) and server.requests == 1)
+
+    check("unknown place comes back as (None, None)", geocoder.geocode("Nowhere, XX") == (None, None))
+    check("unknown place is cached as a miss", geocoder.geocode("Nowhere, XX") == (None, None)
+          and server.queries["Nowhere, XX"] == 1)
+
+    time.sleep(TTL + 0.1)
+    before = server.requests
+    check("expired entries are fetched again",
+          geocoder.geocode("Boston, MA") == (lat, lon) and geocoder.geocode("Nowhere, XX") == (None, None)
+          and server.requests == before + 2)
+
+    restarted = Geocoder(GeocodeCache(db))       # a new process: same file, default TTLs
+    before = server.requests
+    check("a restart is served from the SQLite file",
+          restarted.geocode("Boston, MA") == (lat, lon) and restarted.geocode("Nowhere, XX") == (None, None)
+          and server.requests == before)
+
+    start = time.monotonic()
+    geocoder.geocode("Denver, CO")
+    geocoder.geocode("Austin, TX")
+    check("back-to-back requests wait out the throttle", time.monotonic() - start >= INTERVAL)
+
+    print(f"\nall checks passed ({server.requests} requests to the fake server)")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ Why you might run this
 * Quick sanity-check that your MCP server is live.
 * See the exact spelling of tool names before calling them.
 * Share a lightweight script with teammates who don’t know FastMCP yet.
+* Check what the tool-schema cache (`tool_registry.py`) holds: the list
+  is only re-fetched when the server's version changes or it announces
+  `tools/list_changed`; pass `--refresh` to force a fresh `tools/list`.
 
 Assumptions
 -----------
@@ -18,33 +21,55 @@ Assumptions
 * No authentication is required (default local dev setup).
 """
 
+import argparse                   # built-in: command-line flags
 import asyncio                    # built-in: run asynchronous code
+import os
+import sys
+
 from fastmcp import Client        # official async JSON-RPC wrapper
 
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from tool_registry import ToolRegistry  # noqa: E402  cached tool list + validators
+
+MCP_URL = "http://127.0.0.1:8000/mcp/"
+
 # ╔════════════════════════════════════════════════════════════════╗
 # 1.  Async entry-point                                           ║
 # ╚════════════════════════════════════════════════════════════════╝
-async def main() -> None:
+async def main(refresh: bool = False) -> None:
     """
-    Open an async connection to the MCP endpoint, retrieve the list of
-    tools, and print `name: description` for each.
+    Open an async connection to the MCP endpoint, bring the cached tool
+    list up to date, and print `name: description` for each tool.
     """
+    registry = ToolRegistry(MCP_URL)
+    registry.stale = refresh
+
     # `Client` is an asynchronous context-manager: it opens the HTTP
-    # connection on entry and closes it on exit.
-    async with Client("http://127.0.0.1:8000/mcp/") as mcp:
+    # connection on entry and closes it on exit. The registry listens for
+    # `notifications/tools/list_changed` through the message handler.
+    async with Client(MCP_URL, message_handler=registry.on_message) as mcp:
 
-        # `list_tools()` sends a JSON-RPC request {method:"tools/list"}
-        # and returns a list of Tool objects (attributes: name, description…)
-        tools = await mcp.list_tools()
+        # `sync()` compares the server's name/version from the handshake
+        # with the cached entry and only sends {method:"tools/list"} when
+        # they differ (or the cache is empty, expired or marked stale)
+        fetched = await registry.sync(mcp)
 
         # Print a simple catalogue
-        for tool in tools:
+        for tool in registry.tools.values():
             print(f"{tool.name}: {tool.description}")
 
+    source = "fetched with tools/list" if fetched else "from cache"
+    print(f"\n{len(registry.tools)} tools {source} (server {registry.version}, etag {registry.etag})")
+
 # ╔════════════════════════════════════════════════════════════════╗
 # 2.  Synchronous bootstrap                                       ║
 # ╚════════════════════════════════════════════════════════════════╝
 # asyncio.run() creates an event-loop, executes `main()`, and
 # automatically shuts everything down when `main()` finishes.
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--refresh", action="store_true", help="ignore the cache and re-list the tools")
+    args = parser.parse_args()
+    asyncio.run(main(args.refresh))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+fake_currency_api.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+A local stand-in for the fawazahmed0 currency API, so the currency agent
+can be benchmarked without touching the real mirrors.
+
+It answers `GET /v1/currencies/<base>.json` with a fixed rate table for
+that base after a configurable delay, and counts how many requests it has
+served.
+
+Run it on its own and point the currency agent at it:
+
+    python extra/fake_currency_api.py --port 8766 --delay 0.1
+    CURRENCY_API_URL=http://127.0.0.1:8766/v1/currencies/{base}.json python curr_conv_agent.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Units per 1 USD
+USD_RATES = {
+    "usd": 1.0, "eur": 0.92, "gbp": 0.79, "jpy": 151.3, "chf": 0.90, "cad": 1.37,
+    "aud": 1.52, "inr": 83.4, "cny": 7.24, "mxn": 16.9, "brl": 5.05, "sek": 10.6,
+}
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Request handler                                             ║
+# ╚════════════════════════════════════════════════════════════════╝
+def rate_table(base):
+    """{"date": ..., base: {code: units per 1 base}}, like the real API"""
+    per_usd = USD_RATES[base]
+    return {"date": "2024-01-01", base: {code: rate / per_usd for code, rate in USD_RATES.items()}}
+
+class FakeCurrencyHandler(BaseHTTPRequestHandler):
+    """Serves the fixed table for any known base currency"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        base = self.path.rsplit("/", 1)[-1].removesuffix(".json")
+        if base not in USD_RATES:
+            self.send_error(404, f"unknown currency {base}")
+            return
+        body = json.dumps(rate_table(base)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass   # keep benchmark output readable
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Server helpers                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+class FakeCurrencyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+def start_fake_currency_api(port=0, delay=0.1):
+    """Serve on a background thread; returns (server, URL template with {base})"""
+    server = FakeCurrencyServer(("127.0.0.1", port), FakeCurrencyHandler)
+    server.delay = delay
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/currencies/{{base}}.json"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.1, help="seconds before each response")
+    args = parser.parse_args()
+
+    server, url = start_fake_currency_api(args.port, args.delay)
+    print(f"Fake currency API listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests} requests")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+fake_nominatim.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+A local stand-in for the Nominatim search endpoint, so the geocoder and
+its cache can be checked without touching nominatim.openstreetmap.org.
+
+It answers `GET /search?q=..&format=json&limit=1` with one made-up but
+stable result for any place name, or an empty list for names containing
+"nowhere", after a configurable delay. It counts the requests it has
+served, in total and per query.
+
+Run it on its own and point the agents at it:
+
+    python extra/fake_nominatim.py --port 8767
+    NOMINATIM_URL=http://127.0.0.1:8767/search python mem_agent.py
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Request handler                                             ║
+# ╚════════════════════════════════════════════════════════════════╝
+def fake_place(query):
+    """Coordinates derived from the query text, the same on every call"""
+    h = zlib.crc32(query.casefold().encode())
+    return {"lat": f"{25 + h % 2300 / 100:.4f}", "lon": f"{-124 + h // 2300 % 5800 / 100:.4f}",
+            "display_name": query}
+
+class FakeNominatimHandler(BaseHTTPRequestHandler):
+    """Serves one result per query, or none for unknown ("nowhere") places"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        if url.path != "/search" or not query:
+            self.send_error(400, "q is required")
+            return
+        self.server.queries[query] += 1
+        results = [] if "nowhere" in query.casefold() else [fake_place(query)]
+        body = json.dumps(results).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass   # keep check output readable
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Server helpers                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+class FakeNominatimServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+def start_fake_nominatim(port=0, delay=0.0):
+    """Serve on a background thread; returns (server, search URL)"""
+    server = FakeNominatimServer(("127.0.0.1", port), FakeNominatimHandler)
+    server.delay = delay
+    server.requests = 0
+    server.queries = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each response")
+    args = parser.parse_args()
+
+    server, url = start_fake_nominatim(args.port, args.delay)
+    print(f"Fake Nominatim listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests} requests")
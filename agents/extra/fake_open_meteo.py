@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+fake_open_meteo.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+A local stand-in for the Open-Meteo forecast endpoint, so the weather
+server can be exercised and load-tested without touching the real API.
+
+It answers `GET /v1/forecast?latitude=..&longitude=..&current_weather=true`
+with a deterministic `current_weather` block after a configurable delay,
+and counts how many requests it has served. Comma-separated coordinate
+lists get a JSON array back, one entry per location, like the real API.
+
+Run it on its own and point the MCP server at it:
+
+    python extra/fake_open_meteo.py --port 8765 --delay 0.2
+    OPEN_METEO_URL=http://127.0.0.1:8765/v1/forecast python mcp_server.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Request handler                                             ║
+# ╚════════════════════════════════════════════════════════════════╝
+def fake_reading(lat, lon):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current_weather": {
+            "temperature": round(15 + (lat % 10) - (lon % 5), 1),
+            "weathercode": int(abs(lat + lon)) % 4,
+        },
+    }
+
+class FakeOpenMeteoHandler(BaseHTTPRequestHandler):
+    """Serves a made-up but stable reading for any coordinates"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            lats = [float(x) for x in params["latitude"][0].split(",")]
+            lons = [float(x) for x in params["longitude"][0].split(",")]
+        except (KeyError, ValueError):
+            self.send_error(400, "latitude and longitude are required")
+            return
+        if len(lats) != len(lons):
+            self.send_error(400, "latitude and longitude lists differ in length")
+            return
+        readings = [fake_reading(lat, lon) for lat, lon in zip(lats, lons)]
+        body = json.dumps(readings if len(readings) > 1 else readings[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass   # keep benchmark output readable
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Server helpers                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+class FakeOpenMeteoServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # load tests open many connections at once
+
+def start_fake_open_meteo(port=0, delay=0.1):
+    """Serve on a background thread; returns (server, forecast URL)"""
+    server = FakeOpenMeteoServer(("127.0.0.1", port), FakeOpenMeteoHandler)
+    server.delay = delay
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.1, help="seconds before each response")
+    args = parser.parse_args()
+
+    server, url = start_fake_open_meteo(args.port, args.delay)
+    print(f"Fake Open-Meteo listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.requests} requests")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+load_mcp_agent.py
+────────────────────────────────────────────────────────────────────
+**Purpose**
+Drive many concurrent weather questions through one `mcp_agent`
+AgentRuntime and report throughput and latency, with no Ollama and no
+network: the LLM is a stub that sleeps and replies with a canned plan, and
+the MCP server is an in-process FastMCP stub with the same two tools.
+
+Four set-ups are compared:
+* **async / llm / text**    – the stub's `ainvoke` awaits, as ChatOllama's
+  does, and the LLM plans both steps as free text
+* **blocking / llm / text** – `ainvoke` sleeps synchronously, like calling
+  `invoke()` from inside the loop did before
+* **async / local / text**  – deterministic steps on: the °C → °F step is
+  planned without the LLM
+* **async / local / json**  – the first plan streams as structured JSON and
+  the tool call starts as soon as its args close
+
+Run it from the *agents* directory once lab 2's `mcp_agent.py` is merged:
+
+    python extra/load_mcp_agent.py --questions 50 --llm-delay 0.2
+    python extra/load_mcp_agent.py --url http://127.0.0.1:8000/mcp/   # real server
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from fastmcp import FastMCP
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import mcp_agent  # noqa: E402
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Stubs                                                       ║
+# ╚════════════════════════════════════════════════════════════════╝
+def make_stub_server():
+    """In-process MCP server with the weather server's tool signatures"""
+    stub = FastMCP("StubWeather")
+
+    @stub.tool
+    async def get_weather(lat: float, lon: float) -> dict:
+        return {"temperature": 21.5, "code": 1, "conditions": "Mainly clear"}
+
+    @stub.tool
+    async def convert_c_to_f(c: float) -> float:
+        return c * 9 / 5 + 32
+
+    @stub.tool
+    async def get_weather_many(locations: list[dict]) -> list[dict]:
+        return [{"lat": loc["lat"], "lon": loc["lon"], "temperature": 21.5, "code": 1,
+                 "conditions": "Mainly clear"} for loc in locations]
+
+    @stub.tool
+    async def convert_c_to_f_many(cs: list[float]) -> list[float]:
+        return [c * 9 / 5 + 32 for c in cs]
+
+    return stub
+
+class StubLLM:
+    """Replies with the plan mcp_agent expects after `delay` seconds"""
+
+    def __init__(self, delay: float, blocking: bool = False):
+        self.delay = delay
+        self.blocking = blocking
+
+    def plan(self, messages, structured=False):
+        if len(messages) <= 2:
+            if structured:
+                return ('{"thought": "I need the weather.", "action": "get_weather", '
+                        '"args": {"lat": 40.71, "lon": -74.01}}\n')
+            return ('Thought: I need the weather.\nAction: get_weather\n'
+                    'Args: {"lat": 40.71, "lon": -74.01}')
+        temp_c = messages[-1]["content"].split(":", 1)[1].strip()
+        return f'Thought: Convert to Fahrenheit.\nAction: convert_c_to_f\nArgs: {{"c": {temp_c}}}'
+
+    async def sleep(self, seconds):
+        if self.blocking:
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    @staticmethod
+    def usage(messages, content):
+        # Rough word count standing in for the token usage Ollama reports
+        return {"total_tokens": sum(len(m["content"].split()) for m in messages) + len(content.split())}
+
+    async def ainvoke(self, messages):
+        await self.sleep(self.delay)
+        content = self.plan(messages)
+        return SimpleNamespace(content=content, usage_metadata=self.usage(messages, content))
+
+    async def astream(self, messages, format=None):
+        """`delay` spread over 4-character chunks; usage arrives with the last one, as Ollama's does"""
+        content = self.plan(messages, structured=format is not None)
+        pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+        for piece in pieces:
+            await self.sleep(self.delay / len(pieces))
+            yield SimpleNamespace(content=piece, usage_metadata=None)
+        yield SimpleNamespace(content="", usage_metadata=self.usage(messages, content))
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Load test                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+async def load_test(target, llm, questions):
+    """Return (wall seconds, per-question stats from run()) for `questions` concurrent runs"""
+    runtime = mcp_agent.AgentRuntime(url=target)
+    runtime.llm = llm
+    await runtime.connect()
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):   # the TAO transcript is noise here
+            stats = await asyncio.gather(*[
+                mcp_agent.run(f"What is the current weather in city {i}?", runtime) for i in range(questions)
+            ])
+        return time.perf_counter() - start, stats
+    finally:
+        await runtime.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=50, help="concurrent questions")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="stub LLM seconds per planning turn")
+    parser.add_argument("--url", help="use a running MCP server instead of the in-process stub")
+    args = parser.parse_args()
+
+    target = args.url or make_stub_server()
+    print(f"{args.questions} concurrent questions, stub LLM {args.llm_delay}s per planning turn\n")
+    print(f"{'llm':<9} {'steps':<6} {'plans':<6} {'wall s':>7} {'q/s':>7} {'p50 s':>7} {'p95 s':>7} "
+          f"{'calls/q':>8} {'tokens/q':>9} {'errors':>7}")
+    for mode, steps, plans in (("async", "llm", "text"), ("blocking", "llm", "text"),
+                               ("async", "local", "text"), ("async", "local", "json")):
+        mcp_agent.DETERMINISTIC_STEPS = steps == "local"
+        mcp_agent.STRUCTURED_PLANS = plans == "json"
+        llm = StubLLM(args.llm_delay, blocking=(mode == "blocking"))
+        wall, stats = asyncio.run(load_test(target, llm, args.questions))
+        latencies = [s["seconds"] for s in stats]
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{mode:<9} {steps:<6} {plans:<6} {wall:>7.2f} {args.questions / wall:>7.1f} "
+              f"{statistics.median(latencies):>7.2f} {p95:>7.2f} "
+              f"{statistics.mean(s['llm_calls'] for s in stats):>8.1f} "
+              f"{statistics.mean(s['tokens'] for s in stats):>9.0f} "
+              f"{sum(1 for s in stats if s['error']):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# geo.py
+# Shared geocoding for the travel agents.
+#
+# Lookups go through a persistent SQLite cache keyed by a normalised query
+# ("New York, NY" and "new york ny" are the same key), with a TTL for hits
+# and a shorter one for places Nominatim could not find. Cache misses use
+# one pooled requests.Session with explicit timeouts, so repeat
+# destinations cost a local lookup instead of a network round trip.
+# Requests that do go out are spaced NOMINATIM_MIN_INTERVAL apart, per
+# Nominatim's usage policy of at most one request a second.
+#
+# Distances are vectorised with NumPy: one-to-many and many-to-many
+# haversine in a single array expression instead of a Python loop. For
+# "which office is closest" questions, OfficeIndex keeps the offices in a
+# haversine ball tree, so k-nearest and radius queries touch O(log n)
+# points rather than every office. The index is built once, at agent
+# startup, from coordinates in the CSV where it has them and the geocode
+# cache otherwise.
+
+import csv
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from sklearn.neighbors import BallTree
+
+# Configuration constants
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODE_CACHE_FILE = "geocode_cache.sqlite3"
+GEOCODE_TTL = 30 * 24 * 3600        # places rarely move
+GEOCODE_MISS_TTL = 24 * 3600        # but retry unknown names daily
+HTTP_TIMEOUT = (3.05, 10)           # (connect, read) seconds
+USER_AGENT = "TravelAssistant/1.0"
+NOMINATIM_MIN_INTERVAL = 1.0        # seconds between requests (usage policy)
+EARTH_RADIUS_MILES = 3958.8
+OFFICES_CSV = "../data/offices.csv"
+BALL_TREE_LEAF_SIZE = 40
+
+# --- Geocoding ---
+def normalize_query(query):
+    """Cache key for a place name: case-folded words, punctuation and spacing ignored"""
+    return " ".join(re.findall(r"\w+", query.casefold()))
+
+def make_session(pool_size=8):
+    """A requests.Session with a connection pool and the Nominatim User-Agent"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+class GeocodeCache:
+    """SQLite-backed {normalised query: (lat, lon) or miss} with TTLs, safe to share across threads"""
+
+    def __init__(self, path=GEOCODE_CACHE_FILE, ttl=GEOCODE_TTL, miss_ttl=GEOCODE_MISS_TTL):
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY, query TEXT, lat REAL, lon REAL, fetched_at REAL)"
+            )
+
+    def get(self, query):
+        """Return (found, (lat, lon)); a cached miss is found with (None, None)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT lat, lon, fetched_at FROM geocode WHERE key = ?", (normalize_query(query),)
+            ).fetchone()
+        if row is None:
+            return False, (None, None)
+        lat, lon, fetched_at = row
+        ttl = self.ttl if lat is not None else self.miss_ttl
+        if time.time() - fetched_at > ttl:
+            return False, (None, None)
+        return True, (lat, lon)
+
+    def put(self, query, lat, lon):
+        """Store a result; lat/lon of None records a miss"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, query, lat, lon, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_query(query), query, lat, lon, time.time()),
+            )
+
+class Geocoder:
+    """Nominatim client: cache first, then one pooled HTTP request"""
+
+    def __init__(self, cache=None, base_url=NOMINATIM_URL, session=None, timeout=HTTP_TIMEOUT,
+                 min_interval=NOMINATIM_MIN_INTERVAL):
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.base_url = base_url
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.throttle_lock = threading.Lock()
+        self.next_request_at = 0.0
+
+    def geocode(self, query):
+        """Return (lat, lon), or (None, None) if the place is unknown; network errors propagate"""
+        found, coords = self.cache.get(query)
+        if found:
+            return coords
+        self._wait_turn()
+        response = self.session.get(
+            self.base_url,
+            params={"q": query, "format": "json", "limit": 1},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        geo = response.json()
+        coords = (float(geo[0]["lat"]), float(geo[0]["lon"])) if geo else (None, None)
+        self.cache.put(query, *coords)
+        return coords
+
+    def _wait_turn(self):
+        """Block until this request may go out, at most one per min_interval across threads"""
+        with self.throttle_lock:
+            delay = self.next_request_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_request_at = time.monotonic() + self.min_interval
+
+_default_geocoder = None
+_default_lock = threading.Lock()
+
+def get_geocoder():
+    """The process-wide Geocoder, created on first use"""
+    global _default_geocoder
+    with _default_lock:
+        if _default_geocoder is None:
+            _default_geocoder = Geocoder()
+        return _default_geocoder
+
+def geocode(query):
+    """Geocode `query` with the shared, cached geocoder"""
+    return get_geocoder().geocode(query)
+
+# --- Distances ---
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Scalar great-circle distance in miles (reference implementation)"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
+    return EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """Broadcasting haversine on arrays of degrees"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def haversine_many(lat, lon, lats, lons):
+    """Distances in miles from one point to each of many points, shape (n,)"""
+    return _haversine(lat, lon, lats, lons)
+
+def haversine_matrix(lats1, lons1, lats2, lons2):
+    """Pairwise distances in miles, shape (len(lats1), len(lats2))"""
+    lats1, lons1 = np.asarray(lats1, dtype=np.float64)[:, None], np.asarray(lons1, dtype=np.float64)[:, None]
+    return _haversine(lats1, lons1, lats2, lons2)
+
+# --- Office locations ---
+def load_office_locations(path=OFFICES_CSV):
+    """Offices from the CSV, located by its lat/lon columns if filled in, else the (throttled) geocoder"""
+    offices = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = f"{row['city']}, {row['state']}"
+            if row.get("lat") and row.get("lon"):
+                offices.append({"name": name, "lat": float(row["lat"]), "lon": float(row["lon"])})
+                continue
+            try:
+                lat, lon = geocode(name)
+            except requests.RequestException:
+                continue
+            if lat is not None:
+                offices.append({"name": name, "lat": lat, "lon": lon})
+    return offices
+
+def office_distances(lat, lon, offices):
+    """[(office name, miles)] from (lat, lon) to every office, nearest first"""
+    if not offices:
+        return []
+    miles = haversine_many(lat, lon, [o["lat"] for o in offices], [o["lon"] for o in offices])
+    order = np.argsort(miles)
+    return [(offices[i]["name"], round(float(miles[i]), 2)) for i in order]
+
+# --- Spatial index ---
+class OfficeIndex:
+    """Ball tree over office coordinates (haversine metric) for nearest and within-radius queries"""
+
+    def __init__(self, offices, leaf_size=BALL_TREE_LEAF_SIZE):
+        self.offices = list(offices)
+        points = np.radians([[o["lat"], o["lon"]] for o in self.offices]).reshape(-1, 2)
+        self.tree = BallTree(points, leaf_size=leaf_size, metric="haversine") if self.offices else None
+
+    @classmethod
+    def from_csv(cls, path=OFFICES_CSV):
+        """Index the offices in the CSV, located through the geocode cache"""
+        return cls(load_office_locations(path))
+
+    def __len__(self):
+        return len(self.offices)
+
+    def nearest(self, lat, lon, k=1):
+        """[(office, miles)] for the `k` closest offices, nearest first"""
+        k = min(k, len(self.offices))
+        if k < 1:
+            return []
+        angles, positions = self.tree.query(np.radians([[lat, lon]]), k=k)
+        return [(self.offices[i], float(angle) * EARTH_RADIUS_MILES)
+                for angle, i in zip(angles[0], positions[0])]
+
+    def within(self, lat, lon, miles):
+        """[(office, miles)] for every office within `miles`, nearest first"""
+        if not self.offices:
+            return []
+        positions, angles = self.tree.query_radius(
+            np.radians([[lat, lon]]), r=miles / EARTH_RADIUS_MILES, return_distance=True, sort_results=True
+        )
+        return [(self.offices[i], float(angle) * EARTH_RADIUS_MILES)
+                for angle, i in zip(angles[0], positions[0])]
+
+_office_index = None
+_office_index_lock = threading.Lock()
+
+def get_office_index():
+    """The process-wide OfficeIndex, built from OFFICES_CSV on first use (call it at startup)"""
+    global _office_index
+    with _office_index_lock:
+        if _office_index is None:
+            _office_index = OfficeIndex.from_csv()
+        return _office_index
@@ -3,16 +3,54 @@
 # ------------------------------------------------------------------
 # Robust MCP client showing Thought → Action → Observation → Final
 # with retries on MCP tool errors (e.g. timeouts), and an interactive loop.
+#
+# One AgentRuntime lives for the whole session: a single event loop, one
+# MCP session (reopened only if it drops) and one LLM client, instead of
+# rebuilding all three for every question. LLM calls are awaited
+# (`ainvoke`), so a slow generation never stalls the loop and many
+# questions can share one runtime concurrently.
+#
+# Steps that follow mechanically from an observation (°C → °F after
+# get_weather) are planned locally instead of by another LLM round trip;
+# set DETERMINISTIC_STEPS = False to let the LLM plan every step.
+#
+# The tool list is cached per server version (tool_registry.py) instead of
+# being fetched on every connection, and each plan's Args are checked
+# against the tool's input schema before the call goes out.
+#
+# With STRUCTURED_PLANS the first plan is requested as schema-constrained
+# JSON (Ollama `format=`) and parsed while it streams: no regex to miss,
+# and the tool call starts as soon as the "args" object closes.
+#
+# Tool calls go through a RetryPolicy (retry_policy.py): ToolErrors are
+# retried with jittered backoff inside a per-tool deadline, and a call
+# still running past the tool's p95 is hedged with a second attempt.
+#
+# Each question gets a trace id that travels in every tools/call request's
+# _meta, so the server's per-call log lines can be matched to this turn.
 
 import asyncio
 import json
 import re
 import textwrap
+import time
 
 from fastmcp import Client
 from fastmcp.exceptions import ToolError
 from langchain_ollama import ChatOllama  # pip install langchain-ollama
 
+from observability import TRACE_ID, call_tool_traced, new_trace_id
+from plan_stream import PlanScanner, format_plan, plan_schema
+from retry_policy import RetryPolicy
+from tool_registry import ToolRegistry
+
+MCP_URL = "http://127.0.0.1:8000/mcp/"
+REUSE_SESSION = True    # False reconnects every question (the old behaviour), for comparison
+MCP_TIMEOUT = 30        # seconds without a reply before the session counts as dropped
+DETERMINISTIC_STEPS = True   # False asks the LLM to plan every step, for comparison
+STRUCTURED_PLANS = True      # False parses free-text plans with ARGS_RE, for comparison
+FIRST_STEP_TOOLS = ("get_weather", "get_weather_many")   # what a first plan may call
+
 # ── 1. System prompt ───────────────────────────────────────────────
 
 # ── 2. Regex for extracting the JSON args ───────────────────────────
@@ -31,65 +69,270 @@ def unwrap(x):
         return x.value
     return x
 
-# ── 4. Single-run TAO helper with error handling ──────────────────────
-async def run(question: str):
+def as_list(x):
+    """A batch tool's result as a list (a one-element list comes back bare)"""
+    return x if isinstance(x, list) else [x]
 
+# ── 4. Deterministic steps: tool chains that need no reasoning ───────────
+# tool just observed → function(observation) giving the next (tool, args)
+DETERMINISTIC_NEXT = {
+    "get_weather":      lambda obs: ("convert_c_to_f", {"c": obs["temperature"]}),
+    "get_weather_many": lambda obs: ("convert_c_to_f_many",
+                                     {"cs": [o["temperature"] for o in obs if "error" not in o]}),
+}
 
-        print("\n--- Thought → Action → Observation → Final ---\n")
+def deterministic_step(tool: str, observation: dict):
+    """The (tool, args) that must follow `tool`, or None if the LLM has to decide"""
+    if not DETERMINISTIC_STEPS or tool not in DETERMINISTIC_NEXT:
+        return None
+    return DETERMINISTIC_NEXT[tool](observation)
 
-        # 1. Planning turn → get_weather
-        reply1 = llm.invoke(messages)
-        plan1  = reply1.content.strip()
-        print(plan1 + "\n")
+def tokens_used(reply) -> int:
+    """Prompt + completion tokens reported for one LLM reply (0 if unknown)"""
+    usage = getattr(reply, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
 
-        args1 = json.loads(ARGS_RE.search(plan1).group(1))
+async def plan_next(llm, messages: list, tool: str, observation, stats: dict) -> str:
+    """The plan that follows `tool`: written locally if deterministic, else by the LLM"""
+    step = deterministic_step(tool, observation)
+    if step:
+        action, args = step
+        return (f"Thought: {action} follows directly from the observation (deterministic, no LLM call)\n"
+                f"Action: {action}\nArgs: {json.dumps(args)}")
+    reply = await llm.ainvoke(messages)
+    stats["llm_calls"] += 1
+    stats["tokens"] += tokens_used(reply)
+    return reply.content.strip()
 
+async def plan_first(llm, runtime, messages: list, stats: dict):
+    """First planning turn → (plan text, action, args or None, tool call already started or None)"""
+    stats["llm_calls"] += 1
+    if not STRUCTURED_PLANS:
+        reply = await llm.ainvoke(messages)
+        stats["tokens"] += tokens_used(reply)
+        plan = reply.content.strip()
         try:
-        except ToolError as e:
-            print(f"⚠️  Error calling get_weather: {e}\n")
-            return
-
-        result1 = unwrap(raw1)
-        temp_c     = result1.get("temperature")
-        conditions = result1.get("conditions", "Unknown")
-        print(f"Observation: {{'temperature': {temp_c}, 'conditions': '{conditions}'}}\n")
-
-        # feed back only the numeric temperature
-        messages += [
-            {"role": "assistant", "content": plan1},
-            {"role": "user",      "content": f"Observation: {temp_c}"},
-        ]
-
-        # 2. Planning turn → convert_c_to_f
-        reply2 = llm.invoke(messages)
-        plan2  = reply2.content.strip()
-        print(plan2 + "\n")
+            args = json.loads(ARGS_RE.search(plan).group(1))
+        except (AttributeError, ValueError):
+            return plan, None, None, None
+        return plan, "get_weather_many" if "locations" in args else "get_weather", args, None
 
-        try:
-        except ToolError as e:
-            print(f"⚠️  Error calling convert_c_to_f: {e}\n")
-            return
+    scanner = PlanScanner()
+    call = None
+    async for chunk in llm.astream(messages, format=plan_schema(FIRST_STEP_TOOLS)):
+        stats["tokens"] += tokens_used(chunk)
+        if scanner.feed(chunk.content) and call is None and "action" in scanner.fields:
+            # Args are complete: start the call while the rest of the reply streams in
+            call = asyncio.ensure_future(runtime.call_tool(scanner.fields["action"], scanner.fields["args"]))
+    fields = scanner.result()
+    return format_plan(fields), fields.get("action"), fields.get("args"), call
+
+# ── 5. Persistent runtime: one loop, one MCP session, one LLM ─────────────
+class AgentRuntime:
+    """Long-lived LLM client and MCP session shared by every question"""
+
+    def __init__(self, url: str = MCP_URL, reuse_session: bool = REUSE_SESSION):
+        self.url = url
+        self.reuse_session = reuse_session
+        self.registry = ToolRegistry(url)
+        self.retry = RetryPolicy()
+        self.generation = 0     # bumped on every (re)connect
+        self.connect_lock = asyncio.Lock()
+
+    async def connect(self) -> float:
+        """(Re)open the MCP session; returns the setup time in ms"""
+        start = time.perf_counter()
+        if self.mcp.is_connected():
+            await self.mcp.close()
+        await self.mcp.__aenter__()
+        if not self.mcp.is_connected():
+            await self.mcp.close()      # re-raises the reason the session failed to start
+            raise ConnectionError(f"Could not connect to {self.url}")
+        await self.registry.sync(self.mcp)   # tools/list only if the server's tools changed
+        self.generation += 1
+        return (time.perf_counter() - start) * 1000
+
+    async def reconnect(self, generation: int) -> float:
+        """Reconnect unless another question already did since `generation`"""
+        async with self.connect_lock:
+            if self.generation != generation and self.mcp.is_connected():
+                return 0.0
+            return await self.connect()
+
+    async def start_turn(self) -> float:
+        """Make sure a session is open; returns the setup time this question paid"""
+        if self.reuse_session and self.mcp.is_connected():
+            return 0.0
+        if self.reuse_session:
+            return await self.reconnect(self.generation)
+        async with self.connect_lock:
+            return await self.connect()
 
-        result2 = unwrap(raw2)
+    async def call_tool(self, name: str, args: dict):
+        """call_tool after a local schema check, with retries, hedging and the tool's deadline"""
+        if name not in self.registry.tools:
+            self.registry.stale = True      # the tool may be newer than the cached list
+            await self.registry.sync(self.mcp)
+        self.registry.validate(name, args)  # ToolArgsError: rejected without a round trip
+        return await self.retry.call(name, lambda: self.call_tool_once(name, args))
+
+    async def call_tool_once(self, name: str, args: dict):
+        """One call_tool, reconnecting once if the session has dropped"""
+        generation = self.generation
         try:
-            temp_f = float(result2)
+            return await call_tool_traced(self.mcp, name, args)
+        except ToolError:
+            raise                       # the tool ran and failed: not a connection problem
         except Exception:
-            print(f"⚠️  Unexpected result from convert_c_to_f: {result2}\n")
-            return
+            await self.reconnect(generation)
+            return await call_tool_traced(self.mcp, name, args)
+
+    async def close(self):
+        if self.mcp.is_connected():
+            await self.mcp.close()
+
+# ── 6. Single-run TAO helper with error handling ──────────────────────
+async def run(question: str, runtime: AgentRuntime):
+    llm = runtime.llm
+    start = time.perf_counter()
+    TRACE_ID.set(new_trace_id())     # sent with every tool call this question makes
+    stats = {"llm_calls": 0, "tokens": 0, "setup_ms": await runtime.start_turn(), "trace_id": TRACE_ID.get(),
+             "error": None}
+
+
+    print("\n--- Thought → Action → Observation → Final ---\n")
+
+    # 1. Planning turn → get_weather (a structured plan has already started the call)
+    plan1, action1, args1, call1 = await plan_first(llm, runtime, messages, stats)
+    print(plan1 + "\n")
+
+    if not isinstance(args1, dict):
+        stats["error"] = "No tool arguments found in the plan"
+        print(f"⚠️  {stats['error']}\n")
+        return report(stats, start)
+
+    # Several places in one plan → one batched call instead of one per place
+    if action1 == "get_weather_many":
+        stats["error"] = await run_many(llm, runtime, messages, plan1, args1, stats, call1)
+        return report(stats, start)
 
-        print(f"Observation: {{'temperature_f': {temp_f}}}\n")
+    try:
+    except ToolError as e:
+        stats["error"] = f"Error calling get_weather: {e}"
+        print(f"⚠️  {stats['error']}\n")
+        return report(stats, start)
 
-        # Final answer
-        print(f"Final: {conditions} ({temp_f:.1f} °F)\n")
+    result1 = unwrap(raw1)
+    temp_c     = result1.get("temperature")
+    conditions = result1.get("conditions", "Unknown")
+    print(f"Observation: {{'temperature': {temp_c}, 'conditions': '{conditions}'}}\n")
 
-# ── 5. Interactive loop ─────────────────────────────────────────────────
+    # feed back only the numeric temperature
+    messages += [
+        {"role": "assistant", "content": plan1},
+        {"role": "user",      "content": f"Observation: {temp_c}"},
+    ]
+
+    # 2. Planning turn → convert_c_to_f (planned locally when it is deterministic)
+    plan2 = await plan_next(llm, messages, "get_weather", result1, stats)
+    print(plan2 + "\n")
+
+    try:
+    except ToolError as e:
+        stats["error"] = f"Error calling convert_c_to_f: {e}"
+        print(f"⚠️  {stats['error']}\n")
+        return report(stats, start)
+
+    result2 = unwrap(raw2)
+    try:
+        temp_f = float(result2)
+    except Exception:
+        stats["error"] = f"Unexpected result from convert_c_to_f: {result2}"
+        print(f"⚠️  {stats['error']}\n")
+        return report(stats, start)
+
+    print(f"Observation: {{'temperature_f': {temp_f}}}\n")
+
+    # Final answer
+    print(f"Final: {conditions} ({temp_f:.1f} °F)")
+    return report(stats, start)
+
+async def run_many(llm, runtime: AgentRuntime, messages: list, plan1: str, args1: dict, stats: dict,
+                   call1=None):
+    """The TAO steps for a multi-place plan, using the batch tools; returns an error message or None"""
+    try:
+    except ToolError as e:
+        error = f"Error calling get_weather_many: {e}"
+        print(f"⚠️  {error}\n")
+        return error
+
+    results = as_list(unwrap(raw1))
+    print(f"Observation: {results}\n")
+
+    messages += [
+        {"role": "assistant", "content": plan1},
+        {"role": "user",      "content": f"Observation: {[r.get('temperature') for r in results]}"},
+    ]
+
+    plan2 = await plan_next(llm, messages, "get_weather_many", results, stats)
+    print(plan2 + "\n")
+
+    ok = [r for r in results if "error" not in r]
+    try:
+    except ToolError as e:
+        error = f"Error calling convert_c_to_f_many: {e}"
+        print(f"⚠️  {error}\n")
+        return error
+
+    temps_f = as_list(unwrap(raw2))
+    print(f"Observation: {{'temperatures_f': {temps_f}}}\n")
+
+    # Final answer, one line per place
+    print("Final:")
+    for r, temp_f in zip(ok, temps_f):
+        print(f"  ({r['lat']}, {r['lon']}): {r['conditions']} ({temp_f:.1f} °F)")
+    for r in results:
+        if "error" in r:
+            print(f"  ({r['lat']}, {r['lon']}): unavailable ({r['error']})")
+    return None
+
+def report(stats: dict, start: float) -> dict:
+    """Print and return the per-question cost summary"""
+    stats["seconds"] = time.perf_counter() - start
+    print(f"(LLM calls: {stats['llm_calls']}, tokens: {stats['tokens']}, "
+          f"connection setup: {stats['setup_ms']:.1f} ms, total: {stats['seconds']:.2f} s, "
+          f"trace: {stats['trace_id']}{', failed' if stats.get('error') else ''})\n")
+    return stats
+
+# ── 7. Interactive loop ─────────────────────────────────────────────────
 if __name__ == "__main__":
+    # One event loop for the whole session: the MCP session and the LLM's
+    # HTTP connections stay bound to it between questions
+    loop = asyncio.new_event_loop()
+    start = time.perf_counter()
+    runtime = AgentRuntime()
+    try:
+        loop.run_until_complete(runtime.connect())
+        print(f"Connected to {MCP_URL} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except Exception as e:
+        print(f"⚠️  MCP server not reachable yet ({e}); will retry on the first question")
+
     print("Weather agent (type 'exit' to quit)\n")
-    while True:
-        loc = input("Location (or 'exit'): ").strip()
-        if loc.lower() == "exit":
-            print("Goodbye!")
-            break
-
-        question = f"What is the current weather in {loc}?"
-        asyncio.run(run(question))
+    try:
+        while True:
+            loc = input("Location (or 'exit'): ").strip()
+            if loc.lower() == "exit":
+                print("Goodbye!")
+                break
+
+            question = f"What is the current weather in {loc}?"
+            try:
+                loop.run_until_complete(run(question, runtime))
+            except Exception as e:
+                print(f"⚠️  Error talking to the MCP server: {e}\n")
+    finally:
+        for tool, m in runtime.retry.metrics.summary().items():
+            print(f"{tool}: {m['calls']} calls, {m.get('retries', 0)} retries, "
+                  f"{m.get('hedges', 0)} hedges, p95 {m['p95'] * 1000:.0f} ms, p99 {m['p99'] * 1000:.0f} ms")
+        loop.run_until_complete(runtime.close())
+        loop.close()
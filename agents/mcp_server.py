@@ -1,7 +1,22 @@
 # weather_server.py  – returns temperature *and* conditions
+#
+# Tools are async and share one cached, pooled Open-Meteo client (see
+# weather.py), so concurrent requests for the same place cost one upstream call.
+# The *_many tools take a list of places in one JSON-RPC call and fetch them
+# with Open-Meteo's multi-location requests.
+# The server version is what clients key their cached tool list on.
+#
+# Every tool call is timed and counted by MetricsMiddleware (observability.py)
+# and logged with the caller's trace id; GET /metrics serves per-tool
+# p50/p95/p99, in-flight and error counts, upstream latency and cache hit
+# rates in the Prometheus text format alongside /mcp/.
 
 from fastmcp import FastMCP
-import requests
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from observability import Metrics, MetricsMiddleware
+from weather import WeatherClient
 
 # ── Weather-code → description table ───────────────────────────────────────
 WEATHER_CODES = {
@@ -26,4 +41,7 @@ WEATHER_CODES = {
 # ── Register tools ─────────────────────────────────────────────────────────
 
 
+# ── Metrics endpoint ───────────────────────────────────────────────────────
+
+
 # ── Run the server ─────────────────────────────────────────────────────────
@@ -7,6 +7,8 @@ import math
 import requests
 from smolagents import tool, ToolCallingAgent
 from smolagents import LiteLLMModel
+from geo import geocode, get_office_index, haversine_distance, office_distances
+from short_memory import ShortTermMemory, count_tokens
 
 # ANSI color codes for terminal output
 BLUE = "\033[94m"
@@ -15,16 +17,74 @@ RED = "\033[91m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
+# Print the whole system prompt each turn (otherwise only its token counts)
+DEBUG_PROMPT = False
+
 # Base system prompt guiding agent behavior (tool must be used for distance)
 
 # ----------------------
 # Helper functions
 # ----------------------
+def geocode_location(location_query):
+    """Convert a place name to (lat, lon) through the shared geocode cache"""
+    try:
+        return geocode(location_query)
+    except Exception as e:
+        print(f"{RED}Geocoding error: {e}{RESET}")
+        return None, None
 
 
 # ----------------------
 # Tool definition
 # ----------------------
+@tool
+def office_distances_tool() -> str:
+    """
+    Distance from the user's home location to every company office, nearest first.
+
+    Returns:
+        str: one "City, ST: N miles" line per office.
+    """
+    ranked = office_distances(home_coords[0], home_coords[1], get_office_index().offices)
+    return "\n".join(f"{name}: {miles} miles" for name, miles in ranked)
+
+@tool
+def nearest_offices_tool(location: str, k: int = 3) -> str:
+    """
+    The company offices closest to a place, nearest first.
+
+    Args:
+        location (str): place to search from, e.g. "Boston, MA".
+        k (int): how many offices to return.
+
+    Returns:
+        str: one "City, ST: N miles" line per office.
+    """
+    lat, lon = geocode_location(location)
+    if lat is None or lon is None:
+        return f"Could not find coordinates for {location}"
+    nearest = get_office_index().nearest(lat, lon, k=k)
+    return "\n".join(f"{office['name']}: {miles:.2f} miles" for office, miles in nearest)
+
+@tool
+def offices_within_radius_tool(location: str, miles: float) -> str:
+    """
+    Every company office within a given distance of a place, nearest first.
+
+    Args:
+        location (str): place to search from, e.g. "Boston, MA".
+        miles (float): search radius in miles.
+
+    Returns:
+        str: one "City, ST: N miles" line per office, or a note that none are in range.
+    """
+    lat, lon = geocode_location(location)
+    if lat is None or lon is None:
+        return f"Could not find coordinates for {location}"
+    nearby = get_office_index().within(lat, lon, miles)
+    if not nearby:
+        return f"No offices within {miles} miles of {location}"
+    return "\n".join(f"{office['name']}: {distance:.2f} miles" for office, distance in nearby)
 
 
 # ----------------------
@@ -39,7 +99,7 @@ model = LiteLLMModel(
     temperature=0.0
 )
 agent = ToolCallingAgent(
-    tools=[calculate_distance_tool],
+    tools=[calculate_distance_tool, office_distances_tool, nearest_offices_tool, offices_within_radius_tool],
     model=model
 )
 
@@ -54,8 +114,14 @@ home_location = loc_input.strip() or default_loc
 
 # If coords not set or location changed, geocode and save
 
-# In-memory buffer for short-term memory
-memory_buffer = []
+# Locate every office once, before the first question: on a cold geocode
+# cache that is one throttled Nominatim request per office
+print(f"Located {len(get_office_index())} offices")
+
+# Short-term memory: the last few turns verbatim plus a rolling summary of
+# older ones, kept within a token budget so the prompt stays the same size
+# however long the session runs
+short_memory = ShortTermMemory()
 
 # ----------------------
 # Main interactive loop
@@ -71,14 +137,28 @@ if __name__ == "__main__":
             break
 
         # Build dynamic prompt with profile and recent conv
-
-        # DEBUG: print prompt
-        print("\n========== DEBUG: system_prompt ==========")
-        print(dynamic_prompt)
-        print("========================================\n")
+        # (the conversation part is short_memory.render(), not every turn so far)
+        dynamic_prompt = (
+            f"{SYSTEM_PROMPT}\n\n"
+            f"User profile:\n- Home location: {home_location} ({home_coords[0]}, {home_coords[1]})\n\n"
+            f"{short_memory.render()}"
+        ).rstrip()
+        # The agent's system prompt carries these as its instructions; run()
+        # rebuilds it from them on every turn
+        agent.instructions = dynamic_prompt
+
+        # DEBUG: report the size of the prompt actually sent; the full text only when asked for
+        prompt_tokens = count_tokens(agent.system_prompt) + count_tokens(user_input)
+        print(f"{BLUE}[prompt: {prompt_tokens} tokens; memory: {short_memory.tokens} tokens, "
+              f"{len(short_memory.turns)} recent turns, {short_memory.summarized} summarized]{RESET}")
+        if DEBUG_PROMPT:
+            print("\n========== DEBUG: system_prompt ==========")
+            print(agent.system_prompt)
+            print("========================================\n")
 
         # Run the agent
         final_answer = agent.run(user_input)
         print(f"\n{GREEN}Assistant Final Response:{RESET}\n{final_answer}\n")
 
         # Update memories
+        short_memory.add(user_input, str(final_answer))
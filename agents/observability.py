@@ -0,0 +1,153 @@
+# observability.py
+# Metrics and trace ids for the MCP weather server and its clients.
+#
+# MetricsMiddleware wraps every tool registered on a FastMCP server: it
+# counts calls and errors, tracks how many calls are in flight and keeps a
+# window of recent latencies per tool for p50/p95/p99. Other parts of the
+# server (the Open-Meteo client's upstream latency and cache hit rate)
+# record into the same Metrics registry, and render() writes it all in the
+# Prometheus text format for a /metrics route next to /mcp/.
+#
+# Clients put a trace id in each tools/call request's _meta
+# (call_tool_traced). The middleware makes it the current TRACE_ID for the
+# duration of the call and logs it with the call's outcome and timing, so
+# one agent turn can be followed through every server-side call it made.
+
+import contextvars
+import time
+import uuid
+from collections import defaultdict, deque
+
+import mcp.types
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+from fastmcp.utilities.logging import get_logger
+
+# Configuration constants
+QUANTILES = (0.5, 0.95, 0.99)
+LATENCY_WINDOW = 1000               # recent observations kept per summary
+
+TRACE_ID = contextvars.ContextVar("trace_id", default=None)
+logger = get_logger("trace")
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def quantile(values, q: float) -> float:
+    """Nearest-rank quantile of `values` (0.0 if there are none)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# --- Metrics registry ---
+
+class Metrics:
+    """Counters, gauges and latency summaries, each keyed by name and labels"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.summaries = {}         # key → [recent values, sum, count]
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.counters[self._key(name, labels)] += value
+
+    def add(self, name: str, delta: float, **labels):
+        """Move a gauge up or down"""
+        self.gauges[self._key(name, labels)] += delta
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        if key not in self.summaries:
+            self.summaries[key] = [deque(maxlen=self.window), 0.0, 0]
+        summary = self.summaries[key]
+        summary[0].append(value)
+        summary[1] += value
+        summary[2] += 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for kind, samples in (("counter", self.counters), ("gauge", self.gauges)):
+            typed = set()
+            for (name, labels), value in sorted(samples.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} {kind}")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {value:g}")
+        typed = set()
+        for (name, labels), (recent, total, count) in sorted(self.summaries.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                lines.append(f"{name}{_labels(labels + (('quantile', str(q)),))} {quantile(recent, q):.6f}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+# --- Server side ---
+
+class MetricsMiddleware(Middleware):
+    """Calls, errors, in-flight count and latency for every tool, logged with the caller's trace id"""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        trace_id = request_trace_id(context) or new_trace_id()
+        token = TRACE_ID.set(trace_id)
+        self.metrics.add("mcp_tool_in_flight", 1, tool=tool)
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await call_next(context)
+        except Exception:
+            outcome = "error"
+            self.metrics.inc("mcp_tool_errors_total", tool=tool)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.add("mcp_tool_in_flight", -1, tool=tool)
+            self.metrics.inc("mcp_tool_calls_total", tool=tool)
+            self.metrics.observe("mcp_tool_latency_seconds", elapsed, tool=tool)
+            logger.info("trace=%s tool=%s %s in %.1f ms", trace_id, tool, outcome, elapsed * 1000)
+            TRACE_ID.reset(token)
+
+def request_trace_id(context):
+    """The traceId a client put in this request's _meta, if any"""
+    try:
+        meta = context.fastmcp_context.request_context.meta
+    except (AttributeError, ValueError):
+        return None
+    return getattr(meta, "traceId", None) if meta else None
+
+# --- Client side ---
+
+async def call_tool_traced(client, name: str, args: dict, trace_id=None):
+    """Client.call_tool, with `trace_id` (default: the current TRACE_ID) in the request's _meta"""
+    trace_id = trace_id or TRACE_ID.get()
+    if trace_id is None:
+        return await client.call_tool(name, args)
+    params = mcp.types.CallToolRequestParams.model_validate(
+        {"name": name, "arguments": args, "_meta": {"traceId": trace_id}}
+    )
+    result = await client.session.send_request(
+        mcp.types.ClientRequest(mcp.types.CallToolRequest(method="tools/call", params=params)),
+        mcp.types.CallToolResult,
+    )
+    if result.isError:
+        raise ToolError(result.content[0].text)
+    return result.content
@@ -0,0 +1,94 @@
+# plan_stream.py
+# Incremental parser for schema-constrained tool-call plans.
+#
+# With Ollama's `format=<JSON schema>` the model can only emit an object
+# like {"thought": "...", "action": "get_weather", "args": {...}}, so there
+# is nothing to regex out and nothing to re-ask for. PlanScanner is fed the
+# streamed text chunk by chunk and scans each character once; it reports
+# the moment the "args" object closes, so the tool call can start while
+# the model is still emitting the closing brace and trailing whitespace.
+
+import json
+
+def plan_schema(tool_names) -> dict:
+    """JSON schema for one planning turn, restricted to the given tools"""
+    return {
+        "type": "object",
+        "properties": {
+            "thought": {"type": "string"},
+            "action": {"type": "string", "enum": sorted(tool_names)},
+            "args": {"type": "object"},
+        },
+        "required": ["thought", "action", "args"],
+    }
+
+def format_plan(fields: dict) -> str:
+    """Render a structured plan in the Thought / Action / Args transcript form"""
+    return (f"Thought: {fields.get('thought', '')}\n"
+            f"Action: {fields.get('action')}\n"
+            f"Args: {json.dumps(fields.get('args'))}")
+
+class PlanScanner:
+    """Streaming scanner for a top-level JSON object with an "args" object member"""
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.last_key = None
+        self.key = None             # member whose value is being read at depth 1
+        self.args_start = None
+        self.fields = {}            # top-level string members, then "args"
+        self.done = False
+
+    def feed(self, text: str) -> bool:
+        """Scan another chunk; True once the args object is complete"""
+        self.buf += text
+        buf = self.buf
+        while not self.done and self.pos < len(buf):
+            c = buf[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif c == "\\":
+                    self.escaped = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._top_level_string(json.loads(buf[self.string_start:self.pos + 1]))
+            elif c == '"':
+                self.in_string = True
+                self.string_start = self.pos
+            elif c in "{[":
+                self.depth += 1
+                if self.depth == 2 and c == "{" and self.key == "args":
+                    self.args_start = self.pos
+            elif c in "}]":
+                if self.depth == 2 and self.args_start is not None:
+                    self.fields["args"] = json.loads(buf[self.args_start:self.pos + 1])
+                    self.done = True
+                self.depth -= 1
+            elif self.depth == 1 and c == ":":
+                self.key = self.last_key
+            elif self.depth == 1 and c == ",":
+                self.key = None
+            self.pos += 1
+        return self.done
+
+    def _top_level_string(self, value):
+        if self.key is None:
+            self.last_key = value       # a member name; its value follows the ':'
+        else:
+            self.fields[self.key] = value
+
+    def result(self) -> dict:
+        """Whatever was parsed; the whole object if the stream ended cleanly"""
+        if not self.done:
+            try:
+                return json.loads(self.buf)
+            except ValueError:
+                pass
+        return self.fields
@@ -1,13 +1,13 @@
 # Import necessary libraries
 import os
 import json
-import requests
 import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
-import chromadb
-import pdfplumber
-from sentence_transformers import SentenceTransformer
-from chromadb.utils import embedding_functions
+from embeddings import get_embedding_provider
+from geo import geocode, get_office_index
+from rag_index import build_index
+from rag_search import CityIndex, HybridRetriever
 
 # ANSI color codes for terminal output
 BLUE = "\033[94m"
@@ -21,6 +21,11 @@ BOLD = "\033[1m"
 # Configuration constants
 STARTING_LOC_FILE = "user_starting_location.json"
 DEFAULT_LOCATION = {"city": "Raleigh, NC", "lat": 35.7796, "lon": -78.6382}
+RAG_RESULTS = 2               # snippets returned per document search
+RETRIEVAL_MODE = "hybrid"     # "hybrid" (BM25 + vectors), "dense" or "sparse"
+TURN_WORKERS = 3              # per-turn lookups run in parallel (1 = sequential)
+NEAREST_OFFICES = 3           # offices listed next to the distance
+OFFICE_RADIUS_MILES = 250     # "offices nearby" search radius
 
 # Connect to local Ollama server
 client = OpenAI(
@@ -28,6 +33,9 @@ client = OpenAI(
     api_key='ollama',  # dummy key
 )
 
+# Worker threads for the independent lookups in each turn
+turn_pool = ThreadPoolExecutor(max_workers=TURN_WORKERS)
+
 # --- Functions for Location Management ---
 def load_starting_location():
     """Load saved starting location from file or return default"""
@@ -73,18 +81,10 @@ def set_starting_location_interactively():
 # --- Core Functions ---
 # --- Convert city name to lat/lon coordinates ---
 def geocode_location(location_query):
-    """Convert city name to lat/lon coordinates"""
+    """Convert city name to lat/lon coordinates (cached, see geo.py)"""
     print(f"{CYAN}Geocoding location: '{location_query}'{RESET}")
-    headers = {'User-Agent': 'TravelAssistant/1.0'}
     try:
-        response = requests.get(
-            f"https://nominatim.openstreetmap.org/search?q={location_query}&format=json", 
-            headers=headers
-        )
-        geo = response.json()
-        if geo:
-            return float(geo[0]['lat']), float(geo[0]['lon'])
-        return None, None
+        return geocode(location_query)
     except Exception as e:
         print(f"{RED}Geocoding error: {e}{RESET}")
         return None, None
@@ -122,7 +122,17 @@ def calculate_distance_tool(starting_loc, destination_query):
     )
     distance = round(miles, 2)
     print(f"{YELLOW}Calculated distance: {distance} miles{RESET}")
-    return {"destination": destination_query, "distance_miles": distance}
+    return {"destination": destination_query, "distance_miles": distance,
+            "nearest_offices": nearest_offices_tool(dest_lat, dest_lon),
+            "offices_nearby": offices_within_radius_tool(dest_lat, dest_lon)}
+
+def nearest_offices_tool(lat, lon, k=NEAREST_OFFICES):
+    """The k offices closest to a point, as [(office name, miles)]"""
+    return [(office["name"], round(miles, 2)) for office, miles in get_office_index().nearest(lat, lon, k=k)]
+
+def offices_within_radius_tool(lat, lon, radius=OFFICE_RADIUS_MILES):
+    """Every office within `radius` miles of a point, as [(office name, miles)]"""
+    return [(office["name"], round(miles, 2)) for office, miles in get_office_index().within(lat, lon, radius)]
 
 # --- RAG Functions ---
 # --- Search the vector database to find relevant snippets
@@ -144,27 +154,56 @@ def get_city_facts(location_name):
     )
     return completion.choices[0].message.content
 
+def get_city_facts_list(location_name):
+    """Get up to 3 city facts as a list of strings"""
+    city_facts_text = get_city_facts(location_name)
+    return [line[1:].strip() for line in city_facts_text.split('\n')
+            if line.startswith('-') or line.startswith('•')][:3]
+
 # --- Format output ----
-def format_final_output(location_name, office_facts, city_facts, distance_info, starting_city):
-    """Format final response for user"""
+def format_office_section(location_name, office_facts):
+    """Format the office facts part of the response"""
     output = f"{BOLD}{BLUE}Facts about the Office in {location_name}:{RESET}{BLUE}\n\n"
     for fact in office_facts:
         output += f"• {fact.strip()}\n"
-    
-    output += f"\n{BOLD}{BLUE}Facts about {location_name}:{RESET}{BLUE}\n\n"
+    return output
+
+def format_city_section(location_name, city_facts):
+    """Format the city facts part of the response"""
+    output = f"\n{BOLD}{BLUE}Facts about {location_name}:{RESET}{BLUE}\n\n"
     for fact in city_facts:
         output += f"• {fact.strip()}\n"
-    
+    return output
+
+def format_distance_section(distance_info, starting_city):
+    """Format the distance part of the response"""
     dist = distance_info.get('distance_miles', 'unknown')
-    output += f"\n{BOLD}{BLUE}Distance from {starting_city}:{RESET}{BLUE} {dist} miles"
+    output = f"\n{BOLD}{BLUE}Distance from {starting_city}:{RESET}{BLUE} {dist} miles"
+    nearest = distance_info.get('nearest_offices')
+    if nearest:
+        output += f"\n{BOLD}{BLUE}Nearest offices:{RESET}{BLUE} " + ", ".join(f"{name} ({miles} mi)" for name, miles in nearest)
+    nearby = distance_info.get('offices_nearby')
+    if nearby is not None:
+        names = ", ".join(name for name, _ in nearby) or "none"
+        output += f"\n{BOLD}{BLUE}Offices within {OFFICE_RADIUS_MILES} miles:{RESET}{BLUE} {names}"
     return output
 
+def format_final_output(location_name, office_facts, city_facts, distance_info, starting_city):
+    """Format final response for user"""
+    return (format_office_section(location_name, office_facts)
+            + format_city_section(location_name, city_facts)
+            + format_distance_section(distance_info, starting_city))
+
 # --- Document Indexing ---
 
 # --- Main Interaction Loop ---
 if __name__ == "__main__":
     # Set starting location
     starting_loc = set_starting_location_interactively()
+
+    # Locate every office once, before the first question: on a cold geocode
+    # cache that is one throttled Nominatim request per office
+    print(f"{GREEN}Located {len(get_office_index())} offices.{RESET}")
     
     print("\nTravel Assistant ready! (Type 'exit' to quit)")
     print(f"{CYAN}Current starting location: {starting_loc['city']} ({starting_loc['lat']}, {starting_loc['lon']}){RESET}")
@@ -175,7 +214,7 @@ if __name__ == "__main__":
             print("Goodbye!")
             break
 
-        # RAG Document Search
+        # City index lookup, then RAG Document Search
         
         # City Detection Workflow
         if not detected_city:
@@ -185,23 +224,24 @@ if __name__ == "__main__":
             print(f"{RED}Could not detect a valid city name{RESET}")
             continue
 
+        # The three lookups are independent once the city is known, so run
+        # them together: the turn costs about as much as the slowest one
         # Prepare Office Facts
         
         # Prepare City Facts
-        city_facts_text = get_city_facts(detected_city)
-        city_facts = [line[1:].strip() for line in city_facts_text.split('\n') 
-                     if line.startswith('-') or line.startswith('•')][:3]
+        city_future = turn_pool.submit(get_city_facts_list, detected_city)
         
         # Calculate Distance
-        distance_info = calculate_distance_tool(starting_loc, detected_city)
-        
-        # Generate Final Output
-        final_output = format_final_output(
-            detected_city,
-            office_facts,
-            city_facts,
-            distance_info,
-            starting_loc['city']
-        )
+        distance_future = turn_pool.submit(calculate_distance_tool, starting_loc, detected_city)
         
-        print(f"\n{GREEN}Assistant Final Response:{RESET}\n\n{BLUE}{final_output}{RESET}")
+        # Generate Final Output, streaming each section the moment its lookup
+        # finishes (fastest first), so a slow LLM call hides nothing else
+        print(f"\n{GREEN}Assistant Final Response:{RESET}\n")
+        sections = {
+            office_future: lambda facts: format_office_section(detected_city, facts),
+            city_future: lambda facts: format_city_section(detected_city, facts),
+            distance_future: lambda info: format_distance_section(info, starting_loc['city']),
+        }
+        for future in as_completed(sections):
+            section = sections[future](future.result()).strip("\n")
+            print(f"{BLUE}{section}{RESET}\n", flush=True)
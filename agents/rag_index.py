@@ -0,0 +1,304 @@
+# rag_index.py
+# Persistent ChromaDB index shared by the RAG agents.
+#
+# Every source file is content-hashed, so an unchanged corpus is neither
+# re-parsed nor re-embedded on restart. Document ids are hashes of their
+# text, so when a file does change only the lines that actually differ are
+# embedded again. The collection name carries the embedding model, which
+# keeps vectors from different models from ever being mixed. Sources are
+# keyed by their path relative to DATA_ROOT, not by absolute path, so a
+# moved or re-cloned checkout reuses the index as it is.
+#
+# Ingestion is a chain of generators (page -> chunk -> batch -> upsert), so
+# only one page and one batch of chunks are ever held in memory, whatever
+# the size of the corpus. Chunks are token-budgeted windows over sections
+# of a page, tagged with the page and the office city they describe.
+
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import chromadb
+import pdfplumber
+
+from embeddings import EMBED_MODEL, get_embedding_provider
+from rag_search import CityMatcher
+
+# Configuration constants
+INDEX_DIR = ".rag_index"
+DATA_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+MANIFEST_FILE = "manifest.json"
+MIN_DOC_CHARS = 20
+INGEST_BATCH_SIZE = 64
+SUPPORTED_EXTENSIONS = (".pdf", ".csv")
+EXTRACT_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_PAGES = 32   # below this, process start-up costs more than it saves
+PAGES_PER_TASK = 8
+CHUNK_TOKENS = 128        # whitespace tokens; stays under MiniLM's 256-wordpiece limit
+CHUNK_OVERLAP = 24
+
+# Cities that appear in the office documents (data/offices.pdf + data/offices.csv)
+OFFICE_CITIES = [
+    "New York", "San Francisco", "Chicago", "Austin", "Boston", "London",
+    "Toronto", "Tokyo", "Sydney", "Berlin", "Paris", "Dubai", "Mumbai",
+    "Sao Paulo", "Cape Town", "Amsterdam", "Seoul", "Mexico City", "Singapore",
+    "Madrid", "Atlanta", "Denver", "Seattle", "Miami", "Los Angeles",
+]
+
+# --- Hashing helpers ---
+def file_sha256(path):
+    """Content hash of a source file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_key(path, root=DATA_ROOT):
+    """Location-independent name for a source file: its path relative to `root`"""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(root)).replace(os.sep, "/")
+
+def doc_id(source, text):
+    """Stable id for one document: same source + same text -> same id"""
+    return hashlib.sha1(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+def collection_name(base, model_name):
+    """Collection name scoped to the embedding model"""
+    slug = re.sub(r"[^a-z0-9]+", "-", model_name.split("/")[-1].lower()).strip("-")
+    tag = hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:8]
+    return f"{base}-{slug}-{tag}"
+
+# --- Manifest of indexed source hashes ---
+def load_manifest():
+    """Load {collection: {source: fingerprint}} from the index directory"""
+    path = os.path.join(INDEX_DIR, MANIFEST_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_manifest(manifest):
+    """Atomically write the manifest next to the Chroma files"""
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = os.path.join(INDEX_DIR, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+# --- Document extraction (one page at a time) ---
+def extract_page_range(path, start, stop):
+    """Extract [(page_number, text)] for pages start..stop-1; runs in pool workers"""
+    pages = []
+    with pdfplumber.open(path) as pdf:
+        for index in range(start, stop):
+            page = pdf.pages[index]
+            pages.append((index + 1, page.extract_text() or ""))
+            page.close()
+    return pages
+
+def iter_pdf_pages(path, workers=EXTRACT_WORKERS):
+    """Yield (page_number, text) in page order, fanning large PDFs out to a process pool"""
+    with pdfplumber.open(path) as pdf:
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+            for number, page in enumerate(pdf.pages, 1):
+                yield number, page.extract_text() or ""
+                page.close()
+            return
+
+    # Keep only a couple of tasks per worker in flight so extracted text
+    # never piles up faster than the embedder can consume it
+    # Spawned, not forked: the embedder loads torch in this process while
+    # pages are still being extracted, and a fork mid-import can deadlock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for start in range(0, page_count, PAGES_PER_TASK):
+            stop = min(start + PAGES_PER_TASK, page_count)
+            pending.append(pool.submit(extract_page_range, path, start, stop))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def iter_csv_rows(path):
+    """Yield (row_number, text) with each CSV row rendered as 'column: value' pairs"""
+    with open(path, newline="", encoding="utf-8") as f:
+        for number, row in enumerate(csv.DictReader(f), 1):
+            yield number, ", ".join(f"{key}: {value}" for key, value in row.items())
+
+def iter_pages(path, workers=EXTRACT_WORKERS):
+    """Dispatch to the page reader for the file type"""
+    if path.lower().endswith(".csv"):
+        return iter_csv_rows(path)
+    return iter_pdf_pages(path, workers)
+
+def iter_sources(paths):
+    """Expand directories into the supported files they contain"""
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.listdir(path)):
+                if entry.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield os.path.join(path, entry)
+        else:
+            yield path
+
+# --- Chunking ---
+def token_count(text):
+    """Cheap token estimate: whitespace-separated words"""
+    return len(text.split())
+
+def is_heading(line):
+    """Short, digit-free, unpunctuated lines start a new section"""
+    return (len(line.split()) <= 6 and line[:1].isupper()
+            and not any(ch.isdigit() for ch in line) and not line.endswith((".", ",", ";", ":")))
+
+def iter_sections(text, find_city):
+    """Split a page into (city, lines) sections at blank lines, headings and city changes"""
+    lines, section_city = [], None
+    for raw in text.split("\n"):
+        line = raw.strip()
+        city = find_city(line) if line else None
+        if lines and (not line or is_heading(line) or (city and section_city and city != section_city)):
+            yield section_city, lines
+            lines, section_city = [], None
+        if line:
+            lines.append(line)
+            section_city = section_city or city
+    if lines:
+        yield section_city, lines
+
+def split_long_line(line, max_tokens, overlap):
+    """Break a line longer than the budget into overlapping word windows"""
+    words = line.split()
+    step = max(1, max_tokens - overlap)
+    for start in range(0, len(words), step):
+        yield " ".join(words[start:start + max_tokens])
+        if start + max_tokens >= len(words):
+            break
+
+def window_section(lines, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+    """Pack whole lines into windows of at most max_tokens, repeating ~overlap tokens between windows"""
+    window, size = [], 0
+    for line in lines:
+        pieces = split_long_line(line, max_tokens, overlap) if token_count(line) > max_tokens else [line]
+        for piece in pieces:
+            tokens = token_count(piece)
+            if window and size + tokens > max_tokens:
+                yield "\n".join(window)
+                carry, carried = [], 0
+                for previous in reversed(window):
+                    previous_tokens = token_count(previous)
+                    if carried + previous_tokens > overlap or carried + previous_tokens + tokens > max_tokens:
+                        break
+                    carry.insert(0, previous)
+                    carried += previous_tokens
+                window, size = carry, carried
+            window.append(piece)
+            size += tokens
+    if window:
+        yield "\n".join(window)
+
+def iter_chunks(source, pages, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, cities=OFFICE_CITIES):
+    """Turn pages into (id, document, metadata) chunks, skipping duplicates"""
+    find_city = CityMatcher(cities).find
+    seen = set()
+    for page_number, text in pages:
+        for city, lines in iter_sections(text, find_city):
+            for chunk in window_section(lines, max_tokens, overlap):
+                if len(chunk) <= MIN_DOC_CHARS:
+                    continue
+                chunk_id = doc_id(source, chunk)
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+                metadata = {"source": source, "page": page_number}
+                if city:
+                    metadata["city"] = city
+                yield chunk_id, chunk, metadata
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+# --- Index maintenance ---
+def open_collection(name, model_name=EMBED_MODEL, persist=True):
+    """Open (or create) the model-scoped collection, on disk or in memory"""
+    chroma_client = chromadb.PersistentClient(path=INDEX_DIR) if persist else chromadb.Client()
+    return chroma_client.get_or_create_collection(
+        name=collection_name(name, model_name),
+        embedding_function=get_embedding_provider(model_name)
+    )
+
+def remove_source(collection, source):
+    """Drop every document that came from `source`"""
+    collection.delete(where={"source": source})
+
+def has_source(collection, source):
+    """Whether any document from `source` is in the collection"""
+    return bool(collection.get(where={"source": source}, limit=1, include=[])["ids"])
+
+def ingest_source(collection, path, manifest, batch_size=INGEST_BATCH_SIZE, workers=EXTRACT_WORKERS,
+                  max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, root=DATA_ROOT):
+    """Stream one source file into the collection; returns the number of chunks embedded"""
+    source = source_key(path, root)
+    indexed = manifest.setdefault(collection.name, {})
+    # Re-chunk when either the file or the chunking settings change, or when
+    # this source's documents are missing from the collection
+    digest = f"{file_sha256(path)}:{max_tokens}:{overlap}"
+    if indexed.get(source) == digest and has_source(collection, source):
+        return 0
+
+    kept = set()
+    embedded = 0
+    for batch in batched(iter_chunks(source, iter_pages(path, workers), max_tokens, overlap), batch_size):
+        ids = [chunk_id for chunk_id, _, _ in batch]
+        kept.update(ids)
+        existing = set(collection.get(ids=ids, include=[])["ids"])
+        fresh = [chunk for chunk in batch if chunk[0] not in existing]
+        if fresh:
+            # Chroma embeds the whole batch in one encoder call
+            collection.upsert(
+                ids=[chunk_id for chunk_id, _, _ in fresh],
+                documents=[document for _, document, _ in fresh],
+                metadatas=[metadata for _, _, metadata in fresh],
+            )
+            embedded += len(fresh)
+
+    stale = set(collection.get(where={"source": source}, include=[])["ids"]) - kept
+    if stale:
+        collection.delete(ids=list(stale))
+
+    indexed[source] = digest
+    return embedded
+
+def build_index(name, sources, model_name=EMBED_MODEL, persist=True, batch_size=INGEST_BATCH_SIZE,
+                workers=EXTRACT_WORKERS, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, root=DATA_ROOT):
+    """Return a collection covering the files (or directories of files) in `sources`"""
+    collection = open_collection(name, model_name, persist)
+    manifest = load_manifest() if persist else {}
+    paths = list(iter_sources(sources))
+    for path in paths:
+        ingest_source(collection, path, manifest, batch_size, workers, max_tokens, overlap, root)
+
+    # Anything indexed before but no longer part of the corpus goes away
+    # (including entries keyed by an older absolute path)
+    indexed = manifest.setdefault(collection.name, {})
+    for source in set(indexed) - {source_key(path, root) for path in paths}:
+        remove_source(collection, source)
+        del indexed[source]
+
+    if persist:
+        save_manifest(manifest)
+    return collection
@@ -0,0 +1,203 @@
+# rag_search.py
+# Retrieval helpers for the RAG agents that avoid a vector query when the
+# question already tells us what we need.
+#
+# Chunks carry a `city` metadata field from ingest time (see rag_index), so
+# an office city named in the user's question can be resolved with one
+# multi-pattern scan of the question and a metadata `where` lookup, with no
+# embedding, no nearest-neighbour search and no LLM fallback.
+#
+# Everything else goes through HybridRetriever: a local BM25 index built
+# from the same chunks, fused with Chroma's dense results by reciprocal
+# rank, so short keyword questions still find the right office.
+
+import heapq
+import math
+import re
+from collections import Counter, deque
+
+# Configuration constants
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60               # standard reciprocal-rank-fusion damping constant
+RRF_CANDIDATES = 10      # hits taken from each ranker before fusing
+
+# --- City lookup ---
+class CityMatcher:
+    """Aho-Corasick automaton over city names: one pass per text, however many cities"""
+
+    def __init__(self, cities):
+        self.cities = sorted(set(cities))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for city in self.cities:
+            self._add(city)
+        self._link()
+
+    def _add(self, city):
+        state = 0
+        for ch in city.lower():
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state].append(city)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, target in self.goto[state].items():
+                queue.append(target)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[target] = self.goto[fallback].get(ch, 0)
+                self.output[target] = self.output[target] + self.output[self.fail[target]]
+
+    def find_all(self, text):
+        """Every whole-word city mention as (position, city), leftmost and longest first"""
+        lowered = text.lower()
+        matches = []
+        state = 0
+        for end, ch in enumerate(lowered):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for city in self.output[state]:
+                start = end - len(city) + 1
+                before = lowered[start - 1] if start > 0 else " "
+                after = lowered[end + 1] if end + 1 < len(lowered) else " "
+                if not before.isalnum() and not after.isalnum():
+                    matches.append((start, city))
+        return sorted(matches, key=lambda match: (match[0], -len(match[1])))
+
+    def find(self, text):
+        """The first city named in `text`, or None"""
+        matches = self.find_all(text)
+        return matches[0][1] if matches else None
+
+class CityIndex:
+    """Inverted index city -> chunk ids, read from the chunks' ingest-time metadata"""
+
+    def __init__(self, ids_by_city):
+        self.ids_by_city = ids_by_city
+        self.matcher = CityMatcher(ids_by_city)
+
+    @classmethod
+    def from_collection(cls, collection):
+        """Build the index from collection metadata (no embeddings are loaded)"""
+        ids_by_city = {}
+        records = collection.get(include=["metadatas"])
+        for chunk_id, metadata in zip(records["ids"], records["metadatas"]):
+            city = (metadata or {}).get("city")
+            if city:
+                ids_by_city.setdefault(city, []).append(chunk_id)
+        return cls(ids_by_city)
+
+    @property
+    def cities(self):
+        return self.matcher.cities
+
+    def match(self, text):
+        """The first indexed city named in `text`, or None"""
+        return self.matcher.find(text)
+
+    def office_facts(self, collection, city):
+        """All chunks about `city`, fetched by metadata filter instead of vector search"""
+        if city not in self.ids_by_city:
+            return []
+        return collection.get(where={"city": city}, include=["documents"])["documents"]
+
+# --- Sparse (BM25) retrieval ---
+def tokenize(text):
+    """Lower-cased word tokens"""
+    return re.findall(r"\w+", text.lower())
+
+class BM25Index:
+    """In-memory Okapi BM25 over the collection's chunks"""
+
+    def __init__(self, ids, documents, k1=BM25_K1, b=BM25_B):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        self.postings = {}
+        for position, document in enumerate(self.documents):
+            terms = Counter(tokenize(document))
+            self.lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((position, frequency))
+        count = len(self.documents)
+        self.average_length = (sum(self.lengths) / count) if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(hits) + 0.5) / (len(hits) + 0.5))
+            for term, hits in self.postings.items()
+        }
+
+    @classmethod
+    def from_collection(cls, collection):
+        records = collection.get(include=["documents"])
+        return cls(records["ids"], records["documents"])
+
+    def search(self, query, n_results=RRF_CANDIDATES):
+        """Top [(position, score)] for `query`, touching only documents that share a term"""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / self.average_length)
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+
+# --- Hybrid retrieval ---
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Merge ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in"""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+class HybridRetriever:
+    """Dense (Chroma) + sparse (BM25) retrieval fused with reciprocal rank"""
+
+    MODES = ("hybrid", "dense", "sparse")
+
+    def __init__(self, collection, embedder, candidates=RRF_CANDIDATES):
+        self.collection = collection
+        self.embedder = embedder
+        self.candidates = candidates
+        self.bm25 = BM25Index.from_collection(collection)
+        self.documents = dict(zip(self.bm25.ids, self.bm25.documents))
+
+    def dense_ids(self, query, n_results):
+        n_results = min(n_results, len(self.documents))
+        if not n_results:
+            return []
+        results = self.collection.query(
+            query_embeddings=[self.embedder.embed_query(query)], n_results=n_results, include=[]
+        )
+        return results["ids"][0]
+
+    def sparse_ids(self, query, n_results):
+        return [self.bm25.ids[position] for position, _ in self.bm25.search(query, n_results)]
+
+    def search(self, query, n_results=2, mode="hybrid"):
+        """Top `n_results` chunk texts for `query`"""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {self.MODES}")
+        if mode == "dense":
+            ids = self.dense_ids(query, n_results)
+        elif mode == "sparse":
+            ids = self.sparse_ids(query, n_results)
+        else:
+            depth = max(n_results, self.candidates)
+            ids = reciprocal_rank_fusion([self.dense_ids(query, depth), self.sparse_ids(query, depth)])
+        return [self.documents[chunk_id] for chunk_id in ids[:n_results]]
@@ -0,0 +1,130 @@
+# rates.py
+# Exchange-rate tables for the currency agent.
+#
+# One response from the currency API holds every rate for its base
+# currency, so RateTable fetches the USD table once and derives any A→B
+# as usd[B] / usd[A] in memory instead of fetching per pair. A table is
+# fresh for RATE_TTL; after that a lookup still answers at once from the
+# stale table while a background thread refreshes it (stale-while-
+# revalidate), so only a lookup with no table at all waits on the network.
+# Tables are saved to RATE_CACHE_FILE next to currency_memory.json, so a
+# restart converts straight away, offline too.
+#
+# Set CURRENCY_API_URL (with a {base} placeholder) to try a local fake first.
+
+import json
+import os
+import threading
+import time
+
+import requests
+
+# Configuration constants
+RATE_API_URLS = [
+    "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies/{base}.json",
+    "https://latest.currency-api.pages.dev/v1/currencies/{base}.json",
+]
+if os.environ.get("CURRENCY_API_URL"):
+    RATE_API_URLS.insert(0, os.environ["CURRENCY_API_URL"])
+RATE_CACHE_FILE = "currency_rates.json"
+RATE_TTL = 3600                     # the API publishes daily; re-check hourly
+PIVOT = "usd"                       # the one table every cross rate is derived from
+HTTP_TIMEOUT = 5
+
+def fetch_rate_table(base: str, urls=None) -> dict:
+    """{code: units per 1 base} from the first mirror that answers"""
+    for url in urls or RATE_API_URLS:
+        try:
+            resp = requests.get(url.format(base=base), timeout=HTTP_TIMEOUT)
+            resp.raise_for_status()
+            rates = resp.json().get(base)
+            if rates:
+                return rates
+        except (requests.RequestException, ValueError):
+            continue
+    raise RuntimeError(f"Failed to fetch {base.upper()} rates")
+
+class RateTable:
+    """Cached rate tables per base currency, with cross rates derived from the pivot"""
+
+    def __init__(self, pivot=PIVOT, ttl=RATE_TTL, cache_file=RATE_CACHE_FILE, urls=None):
+        self.pivot = pivot
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.urls = urls
+        self.tables = {}            # base → (rates, fetched_at)
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.fetches = 0
+        self._load()
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Units of `to_currency` per one `from_currency`"""
+        frm, to = from_currency.lower(), to_currency.lower()
+        if frm == to:
+            return 1.0
+        pivot = self.table(self.pivot)
+        if frm in pivot and to in pivot:
+            return pivot[to] / pivot[frm]
+        # A currency the pivot table lacks: fall back to the source's own table
+        rates = self.table(frm)
+        if to in rates:
+            return rates[to]
+        raise RuntimeError(f"No rate from {from_currency} to {to_currency}")
+
+    def table(self, base: str) -> dict:
+        """Rates for `base`, fetched only if there is no table yet; stale ones refresh in the background"""
+        entry = self.tables.get(base)
+        if entry is None:
+            return self._refresh(base)
+        rates, fetched_at = entry
+        if time.time() - fetched_at > self.ttl:
+            self._revalidate(base)
+        return rates
+
+    def _revalidate(self, base):
+        with self.lock:
+            if base in self.refreshing:
+                return
+            self.refreshing.add(base)
+        threading.Thread(target=self._refresh_quietly, args=(base,), daemon=True).start()
+
+    def _refresh_quietly(self, base):
+        try:
+            self._refresh(base)
+        except RuntimeError:
+            pass                    # offline: keep serving the stale table
+        finally:
+            with self.lock:
+                self.refreshing.discard(base)
+
+    def _refresh(self, base):
+        rates = fetch_rate_table(base, self.urls)
+        with self.lock:
+            self.fetches += 1
+            self.tables[base] = (rates, time.time())
+        self._save()
+        return rates
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.tables = {base: (entry["rates"], entry["fetched_at"]) for base, entry in snapshot.items()}
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        with self.lock:
+            snapshot = {base: {"rates": rates, "fetched_at": fetched_at}
+                        for base, (rates, fetched_at) in self.tables.items()}
+            tmp = f"{self.cache_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.cache_file)
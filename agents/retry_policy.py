@@ -0,0 +1,139 @@
+# retry_policy.py
+# Retries, deadlines and hedged requests for MCP tool calls.
+#
+# A ToolError from one slow or flaky upstream call used to end the whole
+# question. RetryPolicy retries it with exponential backoff and full
+# jitter, so clients that failed together do not retry in lockstep, all
+# inside a per-tool deadline that bounds the call including its retries.
+# It can also hedge read-only tools: if an attempt is still running after
+# the tool's observed p95 latency, an identical second attempt is fired and
+# whichever answers first wins. ToolMetrics counts attempts, retries, hedges
+# and deadline misses and keeps recent latencies for p50/p95/p99.
+
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict, deque
+
+from fastmcp.exceptions import ToolError
+
+from observability import quantile
+from tool_registry import ToolArgsError
+
+# Configuration constants
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.2                  # seconds before the first retry (before jitter)
+BACKOFF_MAX = 2.0
+DEFAULT_DEADLINE = 30.0             # seconds for a whole tool call, retries included
+TOOL_DEADLINES = {"get_weather_many": 60.0}
+HEDGE_TOOLS = ("get_weather", "get_weather_many", "convert_c_to_f", "convert_c_to_f_many")  # safe to send twice
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20              # no hedging until the tool's p95 means something
+LATENCY_WINDOW = 500                # recent latencies kept per tool
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+class ToolMetrics:
+    """Per-tool event counters and windows of recent latencies"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.counts = defaultdict(Counter)
+        self.latencies = defaultdict(lambda: deque(maxlen=window))           # whole calls
+        self.attempt_latencies = defaultdict(lambda: deque(maxlen=window))   # successful attempts
+
+    def count(self, tool: str, event: str):
+        self.counts[tool][event] += 1
+
+    def summary(self) -> dict:
+        """{tool: {event counts..., "p50", "p95", "p99" in seconds}}"""
+        return {
+            tool: {**self.counts[tool],
+                   **{f"p{int(q * 100)}": quantile(self.latencies[tool], q) for q in (0.5, 0.95, 0.99)}}
+            for tool in self.counts
+        }
+
+class RetryPolicy:
+    """How a tool call is retried, hedged and bounded in time"""
+
+    def __init__(self, attempts=MAX_ATTEMPTS, base=BACKOFF_BASE, cap=BACKOFF_MAX,
+                 deadlines=None, default_deadline=DEFAULT_DEADLINE, hedge_tools=HEDGE_TOOLS, metrics=None):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.deadlines = TOOL_DEADLINES if deadlines is None else deadlines
+        self.default_deadline = default_deadline
+        self.hedge_tools = hedge_tools
+        self.metrics = metrics or ToolMetrics()
+
+    def deadline(self, tool: str) -> float:
+        return self.deadlines.get(tool, self.default_deadline)
+
+    def hedge_delay(self, tool: str):
+        """Seconds to wait before hedging `tool`, or None to never hedge it"""
+        samples = self.metrics.attempt_latencies[tool]
+        if tool not in self.hedge_tools or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return quantile(samples, HEDGE_QUANTILE)
+
+    async def call(self, tool: str, fn):
+        """Await fn() for `tool` with retries and hedging; ToolError once the deadline passes"""
+        start = time.perf_counter()
+        deadline = self.deadline(tool)
+        self.metrics.count(tool, "calls")
+        try:
+            return await asyncio.wait_for(self._attempts(tool, fn), deadline)
+        except asyncio.TimeoutError:
+            self.metrics.count(tool, "deadline_exceeded")
+            raise ToolError(f"{tool} did not finish within its {deadline:g} s deadline") from None
+        except ToolError:
+            self.metrics.count(tool, "failures")
+            raise
+        finally:
+            self.metrics.latencies[tool].append(time.perf_counter() - start)
+
+    async def _attempts(self, tool: str, fn):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return await self._hedged(tool, fn)
+            except ToolArgsError:
+                raise                   # the same args would fail the same way
+            except ToolError:
+                if attempt == self.attempts:
+                    raise
+            self.metrics.count(tool, "retries")
+            await asyncio.sleep(backoff_delay(attempt, self.base, self.cap))
+
+    async def _hedged(self, tool: str, fn):
+        """One attempt, plus a second identical one if the first outlives the tool's p95"""
+        first = asyncio.ensure_future(self._timed(tool, fn))
+        pending = {first}
+        try:
+            delay = self.hedge_delay(tool)
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    self.metrics.count(tool, "hedges")
+                    pending.add(asyncio.ensure_future(self._timed(tool, fn)))
+                pending |= done
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.metrics.count(tool, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, tool: str, fn):
+        self.metrics.count(tool, "attempts")
+        start = time.perf_counter()
+        result = await fn()
+        self.metrics.attempt_latencies[tool].append(time.perf_counter() - start)
+        return result
@@ -0,0 +1,125 @@
+# short_memory.py
+# Token-budgeted short-term memory for the travel memory agent.
+#
+# Appending every turn to a list and pasting it into the system prompt makes
+# the prompt, and the time to the first token, grow with the session.
+# ShortTermMemory keeps the last few turns verbatim in a ring buffer and
+# everything older as a rolling summary, and holds the two together under
+# MEMORY_TOKEN_BUDGET. Compaction is incremental at both levels: when a
+# turn pushes the memory over budget, only the oldest turns are folded into
+# the summary, one line each; when the summary passes its own budget, its
+# two oldest lines are merged into one shorter line that keeps the most
+# recent topics of both. Old turns thus fade into ever coarser lines
+# instead of disappearing, and a turn costs the same at the end of a long
+# session as at the start.
+#
+# Token counts are an estimate (words and punctuation), close enough to
+# the model's tokenizer to budget a prompt without loading one.
+
+import re
+from collections import deque
+
+# Configuration constants
+MEMORY_TOKEN_BUDGET = 600           # summary + recent turns, in prompt tokens
+SUMMARY_TOKEN_BUDGET = 200          # the summary's share of the budget
+RECENT_TURNS = 6                    # ring buffer size; older turns are summarized
+SUMMARY_LINE_CHARS = 120            # per-side excerpt kept for a summarized turn
+TOPIC_CHARS = 60                    # per-turn excerpt kept once lines are merged
+MERGED_LINE_TOKENS = 60             # a merged line never grows past this
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text: str) -> int:
+    """Approximate prompt tokens in `text`"""
+    return len(TOKEN_RE.findall(text))
+
+def clip_tokens(text: str, max_tokens: int) -> str:
+    """`text` cut after about `max_tokens` tokens"""
+    for i, m in enumerate(TOKEN_RE.finditer(text)):
+        if i == max_tokens:
+            return text[:m.start()].rstrip() + " …"
+    return text
+
+def _excerpt(text, limit=SUMMARY_LINE_CHARS):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def summarize_turn(user, assistant):
+    """One summary line for a turn: the start of the question and of the answer"""
+    return f"- User asked: {_excerpt(user)} → {_excerpt(assistant)}"
+
+def merge_topics(turns, topics, max_tokens=MERGED_LINE_TOKENS):
+    """(line, kept topics) for `turns` older turns: the newest topics that fit in `max_tokens`"""
+    kept = []
+    for topic in reversed(topics):
+        line = f"- Earlier ({turns} turns), the user asked about: {'; '.join([topic] + kept)}"
+        if kept and count_tokens(line) > max_tokens:
+            break
+        kept.insert(0, topic)
+    line = f"- Earlier ({turns} turns), the user asked about: {'; '.join(kept)}"
+    return clip_tokens(line, max_tokens), kept
+
+class ShortTermMemory:
+    """Recent turns verbatim plus a rolling summary of older ones, within a token budget"""
+
+    def __init__(self, budget=MEMORY_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET,
+                 recent_turns=RECENT_TURNS, summarize=summarize_turn, merge=merge_topics):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.summarize = summarize
+        self.merge = merge
+        self.turns = deque(maxlen=recent_turns)     # (text, tokens, user, assistant)
+        self.summary = deque()                      # (line, tokens, turns covered, topics)
+        self.turn_tokens = 0
+        self.summary_tokens = 0
+        self.summarized = 0                         # turns folded into the summary
+        self.merges = 0                             # summary lines merged into coarser ones
+
+    @property
+    def tokens(self):
+        return self.turn_tokens + self.summary_tokens
+
+    def add(self, user, assistant):
+        """Record a turn, compacting the oldest ones until memory fits its budget"""
+        if len(self.turns) == self.turns.maxlen:
+            self._fold(*self.turns.popleft())
+        # One oversized answer may not take more than the turns' share of the budget
+        text = clip_tokens(f"User: {user}\nAssistant: {assistant}", self.budget - self.summary_budget)
+        tokens = count_tokens(text)
+        self.turns.append((text, tokens, user, assistant))
+        self.turn_tokens += tokens
+        while self.tokens > self.budget and len(self.turns) > 1:
+            self._fold(*self.turns.popleft())
+
+    def _fold(self, text, tokens, user, assistant):
+        self.turn_tokens -= tokens
+        self._push_summary(self.summarize(user, assistant), 1, [_excerpt(user, TOPIC_CHARS)])
+        self.summarized += 1
+        while self.summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self._merge_oldest()
+
+    def _push_summary(self, line, turns, topics, left=False):
+        entry = (line, count_tokens(line), turns, topics)
+        if left:
+            self.summary.appendleft(entry)
+        else:
+            self.summary.append(entry)
+        self.summary_tokens += entry[1]
+
+    def _merge_oldest(self):
+        """Replace the two oldest summary lines with one merged line"""
+        older, newer = self.summary.popleft(), self.summary.popleft()
+        self.summary_tokens -= older[1] + newer[1]
+        turns = older[2] + newer[2]
+        line, topics = self.merge(turns, older[3] + newer[3])
+        self._push_summary(line, turns, topics, left=True)
+        self.merges += 1
+
+    def render(self):
+        """The conversation part of the prompt: summary of earlier turns, then the recent ones"""
+        parts = []
+        if self.summary:
+            parts.append("Summary of earlier conversation:\n" + "\n".join(line for line, *_ in self.summary))
+        if self.turns:
+            parts.append("Recent conversation:\n" + "\n".join(text for text, *_ in self.turns))
+        return "\n\n".join(parts)
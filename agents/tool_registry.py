@@ -0,0 +1,168 @@
+# tool_registry.py
+# Client-side cache of an MCP server's tool list and argument schemas.
+#
+# Asking for tools/list on every connection costs a round trip and sends
+# the same schemas again. The registry keeps the list per server URL,
+# keyed by the server's name/version from the initialize handshake (which
+# every connection gets for free) plus an etag hashed from the schemas,
+# and persists it next to the agent. tools/list is only sent again when
+# the version changes, the entry is older than TOOL_CACHE_TTL, or the
+# server announces notifications/tools/list_changed during the session.
+#
+# Each tool's inputSchema is compiled into a jsonschema validator once per
+# etag, so arguments pulled out of an LLM plan can be checked locally and
+# a malformed call never reaches the server. The check is as lenient as the
+# server's own (pydantic, lax mode) about scalar types: "40.7" passes as a
+# number and "true" as a boolean, since the server would coerce them.
+
+import hashlib
+import json
+import os
+import time
+
+import mcp.types
+from fastmcp.exceptions import ToolError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import extend, validator_for
+
+# Configuration constants
+TOOL_CACHE_FILE = "mcp_tools_cache.json"
+TOOL_CACHE_TTL = 24 * 3600          # re-list at least daily even if the version never changes
+LAX_TRUE = {"1", "true", "t", "yes", "y", "on"}
+LAX_FALSE = {"0", "false", "f", "no", "n", "off"}
+
+class ToolArgsError(ToolError):
+    """Arguments rejected locally by a tool's input schema; the call was never sent"""
+
+def tool_etag(tools) -> str:
+    """Stable hash of the tools' names, descriptions and schemas"""
+    payload = [tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+    blob = json.dumps(sorted(payload, key=lambda t: t["name"]), sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+# Scalar type checks matching pydantic's lax-mode coercions
+def _as_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+def _lax_number(checker, value):
+    return _as_float(value) is not None
+
+def _lax_integer(checker, value):
+    number = _as_float(value)
+    return number is not None and number.is_integer()
+
+def _lax_boolean(checker, value):
+    if isinstance(value, str):
+        return value.strip().lower() in LAX_TRUE | LAX_FALSE
+    return isinstance(value, bool) or (isinstance(value, int) and value in (0, 1))
+
+def compile_validator(schema: dict):
+    """A reusable jsonschema validator for one tool's inputSchema, with lax scalar types"""
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    lax = extend(cls, type_checker=cls.TYPE_CHECKER.redefine_many({
+        "number": _lax_number, "integer": _lax_integer, "boolean": _lax_boolean,
+    }))
+    return lax(schema)
+
+class ToolRegistry:
+    """Tool list and precompiled argument validators for one MCP server"""
+
+    def __init__(self, url, cache_file=TOOL_CACHE_FILE, ttl=TOOL_CACHE_TTL):
+        self.url = url
+        # In-process servers (a FastMCP object instead of a URL) are not persisted
+        self.cache_file = cache_file if isinstance(url, str) else None
+        self.ttl = ttl
+        self.version = None
+        self.etag = None
+        self.fetched_at = 0.0
+        self.tools = {}
+        self.validators = {}
+        self.stale = False
+        self.list_calls = 0
+        self._load()
+
+    async def on_message(self, message):
+        """Client message_handler: mark the list stale when the server says it changed"""
+        if isinstance(message, mcp.types.ServerNotification) and \
+                isinstance(message.root, mcp.types.ToolListChangedNotification):
+            self.stale = True
+
+    async def sync(self, client) -> bool:
+        """Bring the registry up to date for a connected client; True if tools/list was sent"""
+        info = client.initialize_result.serverInfo
+        version = f"{info.name}/{info.version}"
+        fresh = time.time() - self.fetched_at < self.ttl
+        if self.tools and not self.stale and fresh and version == self.version:
+            return False
+        self.stale = False
+        tools = await client.list_tools()
+        self.list_calls += 1
+        self._store(version, tools)
+        return True
+
+    def validate(self, name: str, args: dict):
+        """Raise ToolArgsError if `args` do not fit the input schema of tool `name`"""
+        if name not in self.validators:
+            raise ToolArgsError(f"Unknown tool {name!r}")
+        error = best_match(self.validators[name].iter_errors(args))
+        if error is not None:
+            where = "/".join(str(p) for p in error.absolute_path) or "args"
+            raise ToolArgsError(f"Invalid arguments for {name} ({where}): {error.message}")
+
+    def _store(self, version, tools):
+        etag = tool_etag(tools)
+        if etag != self.etag:
+            self.tools = {tool.name: tool for tool in tools}
+            self.validators = {tool.name: compile_validator(tool.inputSchema) for tool in tools}
+            self.etag = etag
+        self.version = version
+        self.fetched_at = time.time()
+        self._save()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                entry = json.load(f).get(self.url)
+        except (OSError, ValueError):
+            return
+        if not entry:
+            return
+        tools = [mcp.types.Tool.model_validate(t) for t in entry["tools"]]
+        self.tools = {tool.name: tool for tool in tools}
+        self.validators = {tool.name: compile_validator(tool.inputSchema) for tool in tools}
+        self.version = entry["version"]
+        self.etag = entry["etag"]
+        self.fetched_at = entry["fetched_at"]
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        data = {}
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        data[self.url] = {
+            "version": self.version,
+            "etag": self.etag,
+            "fetched_at": self.fetched_at,
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in self.tools.values()],
+        }
+        tmp = f"{self.cache_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.cache_file)
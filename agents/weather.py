@@ -0,0 +1,183 @@
+# weather.py
+# Shared Open-Meteo client for the MCP weather server.
+#
+# Every lookup goes through one pooled httpx.AsyncClient, and results are
+# cached for a short TTL per (lat, lon) rounded to about a kilometre, so
+# clients asking about the same city share an answer. Identical requests
+# that arrive while a fetch is still in flight wait on that fetch
+# (single-flight) instead of each going upstream. Batches of places use
+# Open-Meteo's multi-location form (comma-separated latitude/longitude
+# lists), so 50 offices cost one or two upstream requests, not 50.
+#
+# Pass a `metrics` registry (observability.Metrics) to record cache hits,
+# coalesced waits and upstream latency.
+#
+# Set OPEN_METEO_URL to point the client at a local fake for testing.
+
+import asyncio
+import os
+import time
+
+import httpx
+
+# Configuration constants
+OPEN_METEO_URL = os.environ.get("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+WEATHER_TTL = 300                   # seconds a current-weather reading stays fresh
+COORD_PRECISION = 2                 # decimal places kept in the cache key (~1 km)
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+MAX_CONNECTIONS = 20
+OPEN_METEO_BATCH = 100              # locations per multi-location request
+
+def cache_key(lat, lon, precision=COORD_PRECISION):
+    """(lat, lon) rounded so that nearby requests share a cache entry"""
+    return (round(float(lat), precision), round(float(lon), precision))
+
+class TTLCache:
+    """{key: value} whose entries expire `ttl` seconds after they are stored"""
+
+    def __init__(self, ttl=WEATHER_TTL):
+        self.ttl = ttl
+        self.entries = {}
+
+    def get(self, key):
+        """Return (found, value); expired entries are dropped"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        value, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return False, None
+        return True, value
+
+    def put(self, key, value):
+        self.entries[key] = (value, time.monotonic())
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one shared task"""
+
+    def __init__(self):
+        self.inflight = {}
+
+    def task(self, key, fn):
+        """The in-flight task for `key`, starting fn() if there is none"""
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    async def do(self, key, fn):
+        """Await fn() for `key`, joining the call already running for it if there is one"""
+        # A cancelled caller must not cancel the fetch the others are waiting on
+        return await asyncio.shield(self.task(key, fn))
+
+    def _finish(self, key, task):
+        self.inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()   # mark as retrieved even if every waiter went away
+
+class WeatherClient:
+    """Open-Meteo current weather: cache first, then one pooled, coalesced request"""
+
+    def __init__(self, base_url=OPEN_METEO_URL, ttl=WEATHER_TTL, precision=COORD_PRECISION, client=None,
+                 metrics=None):
+        self.base_url = base_url
+        self.precision = precision
+        self.cache = TTLCache(ttl)
+        self.flights = SingleFlight()
+        self._client = client
+        self.metrics = metrics
+        self.upstream_calls = 0
+
+    @property
+    def client(self):
+        """The pooled AsyncClient, created on first use inside the running loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def current_weather(self, lat, lon):
+        """Open-Meteo's `current_weather` block for (lat, lon); HTTP errors propagate"""
+        key = cache_key(lat, lon, self.precision)
+        found, value = self.cache.get(key)
+        self._lookup(found, key)
+        if found:
+            return value
+        return await self.flights.do(key, lambda: self._fetch(key))
+
+    async def current_weather_many(self, points):
+        """`current_weather` for each (lat, lon), in order; a failed lookup is returned as its exception"""
+        keys = [cache_key(lat, lon, self.precision) for lat, lon in points]
+        results, pending, missing = {}, {}, []
+        for key in dict.fromkeys(keys):
+            found, value = self.cache.get(key)
+            self._lookup(found, key)
+            if found:
+                results[key] = value
+            elif key in self.flights.inflight:
+                pending[key] = self.flights.inflight[key]
+            else:
+                missing.append(key)
+
+        # Every miss joins one multi-location request; the chunks run concurrently
+        for start in range(0, len(missing), OPEN_METEO_BATCH):
+            chunk = missing[start:start + OPEN_METEO_BATCH]
+            batch = asyncio.ensure_future(self._fetch_many(chunk))
+            for i, key in enumerate(chunk):
+                pending[key] = self.flights.task(key, lambda batch=batch, i=i: self._pick(batch, i))
+
+        values = await asyncio.gather(*(asyncio.shield(task) for task in pending.values()), return_exceptions=True)
+        results.update(zip(pending, values))
+        return [results[key] for key in keys]
+
+    def _lookup(self, found, key):
+        if self.metrics is None:
+            return
+        outcome = "hit" if found else "coalesced" if key in self.flights.inflight else "miss"
+        self.metrics.inc("weather_cache_lookups_total", outcome=outcome)
+
+    @staticmethod
+    async def _pick(batch, i):
+        return (await batch)[i]
+
+    async def _fetch(self, key):
+        return (await self._fetch_many([key]))[0]
+
+    async def _fetch_many(self, keys):
+        self.upstream_calls += 1
+        start = time.perf_counter()
+        try:
+            resp = await self.client.get(
+                self.base_url,
+                params={
+                    "latitude": ",".join(str(lat) for lat, _ in keys),
+                    "longitude": ",".join(str(lon) for _, lon in keys),
+                    "current_weather": "true",
+                },
+            )
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            if self.metrics is not None:
+                self.metrics.inc("open_meteo_errors_total")
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("open_meteo_request_seconds", time.perf_counter() - start)
+                self.metrics.inc("open_meteo_locations_total", len(keys))
+        payload = resp.json()
+        # One location comes back as an object, several as a list in request order
+        readings = payload if isinstance(payload, list) else [payload]
+        currents = [reading["current_weather"] for reading in readings]
+        for key, current in zip(keys, currents):
+            self.cache.put(key, current)
+        return currents
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None